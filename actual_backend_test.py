@@ -5,23 +5,33 @@ Tests the real backend APIs that exist in the current implementation
 """
 
 import requests
+import argparse
 import json
 import sys
 import time
-from datetime import datetime
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
+from tests.regression import add_arguments as add_gate_arguments, run_gated
+from tests.reporting import DEFAULT_REPORT_DIR, RunRecorder
+from tests.sessions import provider_for
+
 class ActualBackendTester:
     def __init__(self, base_url="http://localhost:8001"):
         self.base_url = base_url
         self.api_base = f"{base_url}/api"
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # Pooled keep-alive session and login tokens shared by every suite in the process
+        self.auth = provider_for(self.api_base)
+        self.session = self.auth.session
         
         # Test tracking
         self.tests_run = 0
         self.tests_passed = 0
         self.failed_tests = []
+        self.recorder = RunRecorder(type(self).__name__)
+        self.report_dir = DEFAULT_REPORT_DIR
 
     def log_test(self, name: str, success: bool, details: str = ""):
         """Log test results"""
@@ -31,6 +41,7 @@ class ActualBackendTester:
         if details:
             print(f"    {details}")
         
+        self.recorder.record_test(name, success, details)
         if success:
             self.tests_passed += 1
         else:
@@ -42,6 +53,7 @@ class ActualBackendTester:
         """Make HTTP request and return success status and response"""
         url = f"{self.api_base}/{endpoint}" if endpoint else self.api_base
         
+        start = time.perf_counter_ns()
         try:
             if method == 'GET':
                 response = self.session.get(url)
@@ -50,6 +62,7 @@ class ActualBackendTester:
             else:
                 return False, {"error": f"Unsupported method: {method}"}
             
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, response)
             success = response.status_code == expected_status
             try:
                 response_data = response.json()
@@ -59,6 +72,7 @@ class ActualBackendTester:
             return success, response_data
             
         except Exception as e:
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, error=e)
             return False, {"error": str(e)}
 
     def test_root_endpoint(self):
@@ -115,6 +129,260 @@ class ActualBackendTester:
         self.log_test("Get Status Checks", success, details)
         return success
 
+    def test_bulk_create_status_checks(self):
+        """Test bulk status check ingestion"""
+        test_data = [
+            {"client_name": f"bulk_client_{int(time.time())}_{i}"} for i in range(3)
+        ] + [{"unexpected": "field"}]
+
+        success, response = self.make_request('POST', 'status/bulk', test_data)
+
+        if success:
+            statuses = [item.get('status') for item in response.get('results', [])]
+            success = response.get('created') == 3 and statuses[-1] == 'invalid'
+            details = f"Created: {response.get('created')}, Failed: {response.get('failed')}"
+        else:
+            details = f"Response: {response}"
+
+        self.log_test("Bulk Create Status Checks", success, details)
+        return success
+
+    def test_status_pagination(self):
+        """Test cursor pagination and NDJSON streaming of status checks"""
+        try:
+            response = self.session.get(f"{self.api_base}/status", params={"limit": 1})
+            success = response.status_code == 200 and len(response.json()) <= 1
+            next_cursor = response.headers.get('X-Next-Cursor')
+            details = f"First page: {len(response.json())} item(s), next cursor: {bool(next_cursor)}"
+
+            if success and next_cursor:
+                response = self.session.get(f"{self.api_base}/status",
+                                            params={"limit": 1, "cursor": next_cursor})
+                success = response.status_code == 200
+                details += f", second page status: {response.status_code}"
+
+            if success:
+                response = self.session.get(f"{self.api_base}/status", params={"stream": "true"})
+                lines = [line for line in response.text.splitlines() if line]
+                success = response.status_code == 200 and all(json.loads(line).get('id') for line in lines)
+                details += f", streamed {len(lines)} rows"
+        except Exception as e:
+            success = False
+            details = f"Error: {str(e)}"
+
+        self.log_test("Status Pagination", success, details)
+        return success
+
+    def test_status_filters(self):
+        """Test client, time range, order and field filters of the status listing"""
+        url = f"{self.api_base}/status"
+        client_name = f"filter_client_{uuid.uuid4().hex[:12]}"
+        try:
+            posted = []
+            for _ in range(3):
+                success, response = self.make_request('POST', 'status', {"client_name": client_name})
+                if not success:
+                    self.log_test("Status Filters", False, f"Could not create a status check: {response}")
+                    return False
+                posted.append(response['id'])
+                # Distinct millisecond timestamps, so since/until split the rows
+                time.sleep(0.01)
+
+            rows = self.session.get(url, params={"client_name": client_name}).json()
+            ids = [row['id'] for row in rows]
+            success = sorted(ids) == sorted(posted) and all(row['client_name'] == client_name for row in rows)
+            details = f"By client: {len(rows)} row(s)"
+
+            if success:
+                rows = self.session.get(url, params={"client_name": client_name, "order": "desc"}).json()
+                success = [row['id'] for row in rows] == ids[::-1]
+                details += f", desc order: {'ok' if success else 'wrong'}"
+
+            if success:
+                middle = rows[1]['timestamp']
+                after = self.session.get(url, params={"client_name": client_name, "since": middle}).json()
+                before = self.session.get(url, params={"client_name": client_name, "until": middle}).json()
+                success = [row['id'] for row in after] == ids[1:] and [row['id'] for row in before] == ids[:1]
+                details += f", since/until: {len(after)}/{len(before)} row(s)"
+
+            if success:
+                rows = self.session.get(url, params={"client_name": client_name, "fields": "id"}).json()
+                success = [set(row) for row in rows] == [{'id'}] * 3
+                details += f", projected fields: {sorted(rows[0]) if rows else []}"
+
+            if success:
+                response = self.session.get(url, params={"fields": "id,no_such_field"})
+                success = response.status_code == 400
+                details += f", unknown field status: {response.status_code}"
+        except Exception as e:
+            success = False
+            details = f"Error: {str(e)}"
+
+        self.log_test("Status Filters", success, details)
+        return success
+
+    def test_conditional_get(self):
+        """Test ETag revalidation of the status listing"""
+        url = f"{self.api_base}/status"
+        params = {"limit": 1}
+        try:
+            response = self.session.get(url, params=params)
+            etag = response.headers.get('ETag')
+            success = response.status_code == 200 and bool(etag)
+            details = f"ETag: {etag}"
+
+            if success:
+                response = self.session.get(url, params=params, headers={'If-None-Match': etag})
+                success = response.status_code == 304 and not response.content
+                details += f", revalidation status: {response.status_code}"
+
+            if success:
+                posted, _ = self.make_request('POST', 'status', {"client_name": f"etag_client_{int(time.time())}"})
+                # Other workers notice the write within STATUS_VERSION_TTL
+                deadline = time.time() + 3
+                while True:
+                    response = self.session.get(url, params=params, headers={'If-None-Match': etag})
+                    if response.status_code != 304 or time.time() > deadline:
+                        break
+                    time.sleep(0.2)
+                new_etag = response.headers.get('ETag')
+                success = posted and response.status_code == 200 and bool(new_etag) and new_etag != etag
+                details += f", after write: {response.status_code} with new ETag {new_etag}"
+        except Exception as e:
+            success = False
+            details = f"Error: {str(e)}"
+
+        self.log_test("Conditional GET", success, details)
+        return success
+
+    def test_readiness(self):
+        """Test readiness probe"""
+        success, response = self.make_request('GET', 'ready')
+
+        if success:
+            success = response.get('status') == 'ready' and response.get('mongo_reachable') is True
+            details = f"Status: {response.get('status')}, Pool saturation: {response.get('pool', {}).get('saturation')}"
+        else:
+            details = f"Response: {response}"
+
+        self.log_test("Readiness Probe", success, details)
+        return success
+
+    def test_status_write_ack(self):
+        """Test write-behind acknowledgement and backpressure of status ingestion"""
+        success, ready = self.make_request('GET', 'ready')
+        ack = ready.get('write_ack') if success else None
+        created = self.create_probe_status()
+        if not created:
+            self.log_test("Status Write Ack", False, f"Could not create a status check (ack mode {ack})")
+            return False
+
+        # ack=flush acknowledges after the insert; ack=enqueue within a flush interval
+        endpoint = f"status?client_name={created['client_name']}"
+        deadline = time.time() + (0 if ack == 'flush' else 3)
+        while True:
+            success, response = self.make_request('GET', endpoint)
+            visible = success and [row.get('id') for row in response] == [created['id']]
+            if visible or time.time() >= deadline:
+                break
+            time.sleep(0.1)
+        details = f"Ack mode: {ack}, readable after ack: {visible}"
+        success = visible
+
+        if success:
+            # A full queue must answer 503 with Retry-After, never an error
+            def post(i):
+                response = self.session.post(f"{self.api_base}/status",
+                                             json={"client_name": f"{created['client_name']}_burst"})
+                return response.status_code, response.headers.get('Retry-After')
+
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                results = list(pool.map(post, range(200)))
+            accepted = sum(1 for code, _ in results if code == 200)
+            rejected = [retry for code, retry in results if code == 503]
+            success = accepted + len(rejected) == len(results) and all(rejected)
+            details += f", burst: {accepted} accepted, {len(rejected)} rejected with 503"
+            unexpected = sorted({code for code, _ in results} - {200, 503})
+            if unexpected:
+                details += f", unexpected statuses: {unexpected}"
+
+        self.log_test("Status Write Ack", success, details)
+        return success
+
+    def create_probe_status(self) -> Optional[dict]:
+        """POST a status check for a client name no other test uses"""
+        client_name = f"probe_client_{int(time.time() * 1000)}"
+        success, response = self.make_request('POST', 'status', {"client_name": client_name})
+        return response if success else None
+
+    def test_latest_status(self):
+        """Test latest status lookup by client"""
+        created = self.create_probe_status()
+        if not created:
+            self.log_test("Latest Status", False, "Could not create a status check")
+            return False
+
+        client_name = created['client_name']
+        success, response = self.make_request('GET', f"status/latest/{client_name}")
+        success = success and response.get('id') == created['id']
+        details = f"Latest for {client_name}: {response.get('id')}"
+
+        if success:
+            success, response = self.make_request('GET', f"status/latest?client_name={client_name}")
+            success = success and [row.get('id') for row in response] == [created['id']]
+            details += f", batch lookup: {len(response)} row(s)"
+
+        if success:
+            success, response = self.make_request('GET', f"status/latest/unknown_{uuid.uuid4().hex}",
+                                                  expected_status=404)
+            details += f", unknown client: {'404' if success else response}"
+
+        self.log_test("Latest Status", success, details)
+        return success
+
+    def test_status_rollups(self):
+        """Test rollup counts include a fresh write"""
+        created = self.create_probe_status()
+        if not created:
+            self.log_test("Status Rollups", False, "Could not create a status check")
+            return False
+
+        since = (datetime.utcnow() - timedelta(hours=1)).isoformat()
+        endpoint = f"status/rollups?since={since}&client_name={created['client_name']}"
+        # Rollups are updated in the background after the write is acknowledged
+        deadline = time.time() + 3
+        while True:
+            success, response = self.make_request('GET', endpoint)
+            total = sum(bucket.get('count', 0) for bucket in response.get('buckets', [])) if success else 0
+            if not success or total or time.time() > deadline:
+                break
+            time.sleep(0.2)
+
+        success = success and total == 1
+        details = f"Resolution: {response.get('resolution')}, Count: {total}" if total else f"Response: {response}"
+        self.log_test("Status Rollups", success, details)
+        return success
+
+    def test_status_summary(self):
+        """Test per-client summary includes a fresh write"""
+        created = self.create_probe_status()
+        if not created:
+            self.log_test("Status Summary", False, "Could not create a status check")
+            return False
+
+        success, response = self.make_request('GET', f"status/summary?client_name={created['client_name']}")
+
+        if success:
+            clients = response.get('clients', [])
+            success = len(clients) == 1 and clients[0].get('last_id') == created['id'] \
+                and clients[0].get('count') == 1
+            details = f"Clients: {len(clients)}, Buckets: {len(response.get('buckets', []))}"
+        else:
+            details = f"Response: {response}"
+
+        self.log_test("Status Summary", success, details)
+        return success
+
     def test_backend_connectivity(self):
         """Test basic backend connectivity"""
         try:
@@ -141,10 +409,19 @@ class ActualBackendTester:
         print("🔧 API TESTS")
         self.test_root_endpoint()
         self.test_create_status_check()
+        self.test_bulk_create_status_checks()
         self.test_get_status_checks()
+        self.test_status_pagination()
+        self.test_status_filters()
+        self.test_conditional_get()
+        self.test_readiness()
+        self.test_latest_status()
+        self.test_status_write_ack()
+        self.test_status_rollups()
+        self.test_status_summary()
         
         # Print summary
-        self.print_summary()
+        return self.print_summary()
 
     def print_summary(self):
         """Print test summary"""
@@ -160,6 +437,10 @@ class ActualBackendTester:
             for i, failure in enumerate(self.failed_tests, 1):
                 print(f"{i}. {failure}")
         
+        print("\n⏱️  ENDPOINT LATENCY")
+        self.recorder.print_endpoint_table()
+        for path in self.recorder.write(self.report_dir):
+            print(f"📝 Report written to {path}")
         print("=" * 60)
         
         # Return exit code
@@ -167,8 +448,18 @@ class ActualBackendTester:
 
 def main():
     """Main function"""
-    tester = ActualBackendTester()
-    exit_code = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--report-dir', default=DEFAULT_REPORT_DIR,
+                        help="Directory for the JSON and JUnit XML reports")
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+
+    def make_tester():
+        tester = ActualBackendTester()
+        tester.report_dir = args.report_dir
+        return tester
+
+    exit_code = run_gated(make_tester, lambda tester: tester.run_all_tests(), args)
     sys.exit(exit_code)
 
 if __name__ == "__main__":
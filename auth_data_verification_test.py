@@ -4,36 +4,48 @@ Authentication Data Verification Test
 Verifies that mitra subscription and donation data is properly stored
 """
 
-import requests
+import argparse
 import json
 import sys
+import threading
 import time
 from datetime import datetime
 
+from tests.scheduler import DEFAULT_WORKERS, run_graph
+from tests.regression import add_arguments as add_gate_arguments, run_gated
+from tests.reporting import DEFAULT_REPORT_DIR, RunRecorder
+from tests.sessions import provider_for
+
 class AuthDataVerificationTester:
     def __init__(self, base_url="https://react-seller-debug.preview.emergentagent.com"):
         self.base_url = base_url
         self.api_base = f"{base_url}/api/v1"
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # Pooled keep-alive session and login tokens shared by every suite in the process
+        self.auth = provider_for(self.api_base)
+        self.session = self.auth.session
         
         # Test tracking
         self.tests_run = 0
         self.tests_passed = 0
         self.failed_tests = []
+        self.recorder = RunRecorder(type(self).__name__)
+        self.report_dir = DEFAULT_REPORT_DIR
+        self.lock = threading.Lock()
 
     def log_test(self, name: str, success: bool, details: str = ""):
         """Log test results"""
-        self.tests_run += 1
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} - {name}")
         if details:
             print(f"    {details}")
         
-        if success:
-            self.tests_passed += 1
-        else:
-            self.failed_tests.append(f"{name}: {details}")
+        self.recorder.record_test(name, success, details)
+        with self.lock:
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
+            else:
+                self.failed_tests.append(f"{name}: {details}")
         print()
 
     def make_request(self, method: str, endpoint: str, data: dict = None, 
@@ -45,6 +57,7 @@ class AuthDataVerificationTester:
         if token:
             headers['Authorization'] = f'Bearer {token}'
             
+        start = time.perf_counter_ns()
         try:
             if method == 'GET':
                 response = self.session.get(url, headers=headers, timeout=30)
@@ -53,6 +66,7 @@ class AuthDataVerificationTester:
             else:
                 return False, {"error": f"Unsupported method: {method}"}
             
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, response)
             success = response.status_code == expected_status
             try:
                 response_data = response.json()
@@ -62,6 +76,7 @@ class AuthDataVerificationTester:
             return success, response_data
             
         except Exception as e:
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, error=e)
             return False, {"error": str(e)}
 
     def test_duplicate_signup_prevention(self):
@@ -265,24 +280,21 @@ class AuthDataVerificationTester:
             self.log_test("Required Field Validation", False, details)
             return False
 
-    def run_all_tests(self):
-        """Run all data verification tests"""
+    def run_all_tests(self, workers: int = DEFAULT_WORKERS):
+        """Run all data verification tests; they are independent, so all in parallel"""
         print("🚀 Starting Authentication Data Verification Tests")
         print(f"🌐 Testing against: {self.base_url}")
         print("=" * 80)
         
-        # Run all tests
-        self.test_duplicate_signup_prevention()
-        print()
-        self.test_phone_number_signup()
-        print()
-        self.test_mitra_subscription_data_integrity()
-        print()
-        self.test_mitra_donation_data_integrity()
-        print()
-        self.test_invalid_otp_handling()
-        print()
-        self.test_missing_required_fields()
+        elapsed = run_graph([
+            self.test_duplicate_signup_prevention,
+            self.test_phone_number_signup,
+            self.test_mitra_subscription_data_integrity,
+            self.test_mitra_donation_data_integrity,
+            self.test_invalid_otp_handling,
+            self.test_missing_required_fields,
+        ], workers, self.session)
+        print(f"⏱️  Completed in {elapsed:.2f}s with {workers} worker(s)")
         
         # Print summary
         return self.print_summary()
@@ -304,6 +316,10 @@ class AuthDataVerificationTester:
         else:
             print("\n✅ ALL TESTS PASSED!")
         
+        print("\n⏱️  ENDPOINT LATENCY")
+        self.recorder.print_endpoint_table()
+        for path in self.recorder.write(self.report_dir):
+            print(f"📝 Report written to {path}")
         print("=" * 80)
         
         # Return exit code
@@ -311,8 +327,20 @@ class AuthDataVerificationTester:
 
 def main():
     """Main function"""
-    tester = AuthDataVerificationTester()
-    exit_code = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Parallel workers (1 runs the tests in order)")
+    parser.add_argument('--report-dir', default=DEFAULT_REPORT_DIR,
+                        help="Directory for the JSON and JUnit XML reports")
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+
+    def make_tester():
+        tester = AuthDataVerificationTester()
+        tester.report_dir = args.report_dir
+        return tester
+
+    exit_code = run_gated(make_tester, lambda tester: tester.run_all_tests(args.workers), args)
     sys.exit(exit_code)
 
 if __name__ == "__main__":
@@ -5,23 +5,34 @@ Tests customer and mitra signup flows with OTP verification and login
 """
 
 import requests
+import argparse
 import json
 import sys
+import threading
 import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from tests.scheduler import DEFAULT_WORKERS, depends, run_graph
+from tests.regression import add_arguments as add_gate_arguments, run_gated
+from tests.reporting import DEFAULT_REPORT_DIR, RunRecorder
+from tests.sessions import provider_for
+
 class AuthenticationTester:
     def __init__(self, base_url="https://react-seller-debug.preview.emergentagent.com"):
         self.base_url = base_url
         self.api_base = f"{base_url}/api/v1"
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # Pooled keep-alive session and login tokens shared by every suite in the process
+        self.auth = provider_for(self.api_base)
+        self.session = self.auth.session
         
         # Test tracking
         self.tests_run = 0
         self.tests_passed = 0
         self.failed_tests = []
+        self.recorder = RunRecorder(type(self).__name__)
+        self.report_dir = DEFAULT_REPORT_DIR
+        self.lock = threading.Lock()
         
         # Store tokens and user data
         self.customer_token = None
@@ -31,16 +42,18 @@ class AuthenticationTester:
 
     def log_test(self, name: str, success: bool, details: str = ""):
         """Log test results"""
-        self.tests_run += 1
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} - {name}")
         if details:
             print(f"    {details}")
         
-        if success:
-            self.tests_passed += 1
-        else:
-            self.failed_tests.append(f"{name}: {details}")
+        self.recorder.record_test(name, success, details)
+        with self.lock:
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
+            else:
+                self.failed_tests.append(f"{name}: {details}")
         print()
 
     def make_request(self, method: str, endpoint: str, data: Dict = None, 
@@ -52,6 +65,7 @@ class AuthenticationTester:
         if token:
             headers['Authorization'] = f'Bearer {token}'
             
+        start = time.perf_counter_ns()
         try:
             if method == 'GET':
                 response = self.session.get(url, headers=headers, timeout=30)
@@ -60,6 +74,7 @@ class AuthenticationTester:
             else:
                 return False, {"error": f"Unsupported method: {method}"}
             
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, response)
             success = response.status_code == expected_status
             try:
                 response_data = response.json()
@@ -69,6 +84,7 @@ class AuthenticationTester:
             return success, response_data
             
         except Exception as e:
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, error=e)
             return False, {"error": str(e)}
 
     def test_backend_connectivity(self):
@@ -89,6 +105,7 @@ class AuthenticationTester:
             self.log_test("Backend Connectivity", False, f"Error: {str(e)}")
             return False
 
+    @depends(produces=['customer_email', 'customer_token'])
     def test_customer_signup(self):
         """Test customer signup flow"""
         print("🔐 Testing Customer Signup Flow")
@@ -138,6 +155,7 @@ class AuthenticationTester:
             self.log_test("Customer Signup - OTP Verification", False, f"OTP verification failed: {response}")
             return False
 
+    @depends(produces=['mitra_subscription_email'])
     def test_mitra_signup_subscription(self):
         """Test mitra signup with subscription (₹12,000)"""
         print("💰 Testing Mitra Signup with Subscription")
@@ -248,6 +266,7 @@ class AuthenticationTester:
             self.log_test("Mitra Donation Signup - OTP Verification", False, f"OTP verification failed: {response}")
             return False
 
+    @depends(consumes=['customer_email'])
     def test_customer_login(self):
         """Test customer login"""
         print("🔑 Testing Customer Login")
@@ -272,6 +291,7 @@ class AuthenticationTester:
             self.log_test("Customer Login", False, f"Login failed: {response}")
             return False
 
+    @depends(consumes=['mitra_subscription_email'])
     def test_mitra_login(self):
         """Test mitra login"""
         print("🔑 Testing Mitra Login")
@@ -296,6 +316,7 @@ class AuthenticationTester:
             self.log_test("Mitra Login", False, f"Login failed: {response}")
             return False
 
+    @depends(consumes=['customer_token'])
     def test_jwt_token_validation(self):
         """Test JWT token validation"""
         print("🎫 Testing JWT Token Validation")
@@ -342,7 +363,7 @@ class AuthenticationTester:
             self.log_test("Invalid Credentials Handling", False, details)
             return False
 
-    def run_all_tests(self):
+    def run_all_tests(self, workers: int = DEFAULT_WORKERS):
         """Run all authentication tests"""
         print("🚀 Starting Authentication System Tests")
         print(f"🌐 Testing against: {self.base_url}")
@@ -354,27 +375,18 @@ class AuthenticationTester:
             print("❌ Backend not accessible, stopping tests")
             return self.print_summary()
         
-        # Authentication flow tests
+        # Authentication flow tests, independent ones in parallel
         print("\n" + "=" * 80)
-        self.test_customer_signup()
-        
-        print("\n" + "=" * 80)
-        self.test_mitra_signup_subscription()
-        
-        print("\n" + "=" * 80)
-        self.test_mitra_signup_donation()
-        
-        print("\n" + "=" * 80)
-        self.test_customer_login()
-        
-        print("\n" + "=" * 80)
-        self.test_mitra_login()
-        
-        print("\n" + "=" * 80)
-        self.test_jwt_token_validation()
-        
-        print("\n" + "=" * 80)
-        self.test_invalid_credentials()
+        elapsed = run_graph([
+            self.test_customer_signup,
+            self.test_mitra_signup_subscription,
+            self.test_mitra_signup_donation,
+            self.test_customer_login,
+            self.test_mitra_login,
+            self.test_jwt_token_validation,
+            self.test_invalid_credentials,
+        ], workers, self.session)
+        print(f"⏱️  Completed in {elapsed:.2f}s with {workers} worker(s)")
         
         # Print summary
         return self.print_summary()
@@ -396,6 +408,10 @@ class AuthenticationTester:
         else:
             print("\n✅ ALL TESTS PASSED!")
         
+        print("\n⏱️  ENDPOINT LATENCY")
+        self.recorder.print_endpoint_table()
+        for path in self.recorder.write(self.report_dir):
+            print(f"📝 Report written to {path}")
         print("=" * 80)
         
         # Return exit code
@@ -403,8 +419,20 @@ class AuthenticationTester:
 
 def main():
     """Main function"""
-    tester = AuthenticationTester()
-    exit_code = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Parallel workers (1 runs the tests in order)")
+    parser.add_argument('--report-dir', default=DEFAULT_REPORT_DIR,
+                        help="Directory for the JSON and JUnit XML reports")
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+
+    def make_tester():
+        tester = AuthenticationTester()
+        tester.report_dir = args.report_dir
+        return tester
+
+    exit_code = run_gated(make_tester, lambda tester: tester.run_all_tests(args.workers), args)
     sys.exit(exit_code)
 
 if __name__ == "__main__":
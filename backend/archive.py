@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Cold-storage archival for status_checks.
+
+Moves rows older than a cutoff out of MongoDB into date-partitioned files:
+
+    ARCHIVE_DIR/status_checks/date=YYYY-MM-DD/part-<uuid>.parquet
+
+Parquet (zstd compressed) needs pyarrow; without it partitions are written
+as gzip-compressed NDJSON. Reads prune partitions by date and push the
+client_name and timestamp predicates into the Parquet reader.
+
+    python archive.py run --older-than-days 30
+    python archive.py query --since 2024-01-01 --client-name agent-7
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (pandas uses it for Parquet)
+    PARQUET = True
+except ImportError:
+    PARQUET = False
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = Path(os.environ.get('ARCHIVE_DIR', Path(__file__).parent / 'archive'))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '50000'))
+COLUMNS = ["id", "client_name", "timestamp"]
+
+
+def partition_dir(root: Path, day: date) -> Path:
+    return root / "status_checks" / f"date={day.isoformat()}"
+
+
+def write_partition(root: Path, day: date, frame: pd.DataFrame) -> Path:
+    directory = partition_dir(root, day)
+    directory.mkdir(parents=True, exist_ok=True)
+    name = f"part-{uuid.uuid4().hex}"
+    if PARQUET:
+        path = directory / f"{name}.parquet"
+        tmp = path.with_suffix(".tmp")
+        frame.to_parquet(tmp, compression="zstd", index=False)
+    else:
+        path = directory / f"{name}.ndjson.gz"
+        tmp = path.with_suffix(".tmp")
+        with gzip.open(tmp, "wt") as out:
+            frame.to_json(out, orient="records", lines=True, date_format="iso", date_unit="ms")
+    # Rename last so readers never see a partial file
+    os.replace(tmp, path)
+    return path
+
+
+async def archive_status_checks(db, cutoff: datetime, root: Path = ARCHIVE_DIR,
+                                batch_size: int = ARCHIVE_BATCH_SIZE) -> int:
+    """Move status checks older than ``cutoff`` to partition files, batch by batch.
+
+    Each batch is written to disk before it is deleted from Mongo, so a crash
+    can at worst leave rows both archived and still in the hot collection.
+    """
+    collection = db.status_checks
+    moved = 0
+    while True:
+        batch = await collection.find({"timestamp": {"$lt": cutoff}}, {"_id": 0, **{c: 1 for c in COLUMNS}}) \
+            .sort([("timestamp", 1), ("id", 1)]).limit(batch_size).to_list(batch_size)
+        if not batch:
+            return moved
+        frame = pd.DataFrame(batch, columns=COLUMNS)
+        for day, part in frame.groupby(frame["timestamp"].dt.date):
+            await asyncio.to_thread(write_partition, root, day, part)
+        ids = [doc["id"] for doc in batch]
+        await collection.delete_many({"timestamp": {"$lt": cutoff}, "id": {"$in": ids}})
+        moved += len(batch)
+        logger.info("Archived %d status checks (%d total)", len(batch), moved)
+
+
+def read_archive(since: datetime, until: datetime, client_name: Optional[str] = None,
+                 root: Path = ARCHIVE_DIR, limit: Optional[int] = None) -> pd.DataFrame:
+    """Load archived rows in [since, until), optionally for one client.
+
+    Partitions are read in date order; with ``limit``, reading stops after
+    the first day that brings the total to ``limit`` rows.
+    """
+    frames: List[pd.DataFrame] = []
+    rows = 0
+    filters = [("timestamp", ">=", since), ("timestamp", "<", until)]
+    if client_name:
+        filters.append(("client_name", "==", client_name))
+
+    day = since.date()
+    while day <= until.date() and (limit is None or rows < limit):
+        directory = partition_dir(root, day)
+        day += timedelta(days=1)
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.iterdir()):
+            if path.suffix == ".parquet":
+                if not PARQUET:
+                    raise RuntimeError(f"{path} needs pyarrow to be read")
+                frame = pd.read_parquet(path, columns=COLUMNS, filters=filters)
+            elif path.name.endswith(".ndjson.gz"):
+                frame = pd.read_json(path, lines=True, compression="gzip", convert_dates=["timestamp"])
+                mask = (frame["timestamp"] >= since) & (frame["timestamp"] < until)
+                if client_name:
+                    mask &= frame["client_name"] == client_name
+                frame = frame[mask]
+            else:
+                continue
+            frames.append(frame)
+            rows += len(frame)
+
+    if not frames:
+        return pd.DataFrame(columns=COLUMNS)
+    result = pd.concat(frames, ignore_index=True).sort_values(["timestamp", "id"], ignore_index=True)
+    return result.head(limit) if limit is not None else result
+
+
+def main():
+    import typer
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    cli = typer.Typer(help="Archive old status checks to local cold storage.")
+
+    @cli.command()
+    def run(older_than_days: float = typer.Option(30, help="Archive rows older than this many days"),
+            batch_size: int = ARCHIVE_BATCH_SIZE):
+        """Move old status checks from MongoDB into archive partitions."""
+        async def job():
+            client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+            try:
+                cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+                moved = await archive_status_checks(client[os.environ['DB_NAME']], cutoff,
+                                                    batch_size=batch_size)
+                typer.echo(f"Archived {moved} status checks older than {cutoff.isoformat()}")
+            finally:
+                client.close()
+        asyncio.run(job())
+
+    @cli.command()
+    def query(since: datetime, until: Optional[datetime] = None, client_name: Optional[str] = None):
+        """Print archived status checks as NDJSON."""
+        frame = read_archive(since, until or datetime.utcnow(), client_name)
+        for row in frame.to_dict(orient="records"):
+            typer.echo(json.dumps(row, default=str))
+
+    logging.basicConfig(level=logging.INFO)
+    cli()
+
+
+if __name__ == "__main__":
+    main()
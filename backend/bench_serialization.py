@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Serialization benchmark for list endpoints.
+
+Compares FastAPI's default response path (response_model validation,
+jsonable_encoder and stdlib json) with the TypeAdapter/orjson path used by
+GET /api/status, with and without the trusted-read shortcut that skips
+re-validating stored rows. Runs in-process without MongoDB.
+
+    python bench_serialization.py [--rows 1000 10000] [--repeat 20]
+"""
+
+import argparse
+import os
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'benchmark')
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server import StatusCheck, status_list_adapter
+from serialization import FastJSONResponse, ModelListResponse, orjson
+
+
+def make_rows(count: int) -> List[dict]:
+    start = datetime.utcnow()
+    return [
+        {"id": str(uuid.uuid4()), "client_name": f"client_{i % 500}",
+         "timestamp": start + timedelta(milliseconds=i)}
+        for i in range(count)
+    ]
+
+
+def build_app(rows: List[dict]) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/default", response_model=List[StatusCheck])
+    async def default_path():
+        return [StatusCheck(**row) for row in rows]
+
+    @app.get("/fast", response_model=List[StatusCheck])
+    async def fast_path():
+        return ModelListResponse(status_list_adapter, [StatusCheck(**row) for row in rows])
+
+    @app.get("/trusted", response_model=List[StatusCheck])
+    async def trusted_path():
+        return FastJSONResponse(rows)
+
+    return app
+
+
+def time_route(client: TestClient, path: str, repeat: int) -> List[float]:
+    client.get(path)  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.get(path)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"orjson installed: {orjson is not None}")
+    print(f"{'rows':>8} {'path':>8} {'p50 ms':>10} {'min ms':>10} {'speedup':>8}")
+    for count in args.rows:
+        client = TestClient(build_app(make_rows(count)))
+        default = time_route(client, "/default", args.repeat)
+        print(f"{count:>8} {'default':>8} {statistics.median(default):>10.2f} {min(default):>10.2f}")
+        for path in ("fast", "trusted"):
+            samples = time_route(client, f"/{path}", args.repeat)
+            speedup = statistics.median(default) / statistics.median(samples)
+            print(f"{count:>8} {path:>8} {statistics.median(samples):>10.2f} {min(samples):>10.2f} {speedup:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Tuple
+from urllib.parse import parse_qsl
+
+import metrics
+
+singleflight_requests = metrics.registry.register(metrics.Counter(
+    "singleflight_requests_total",
+    "Coalesced reads by outcome: leader ran the query, shared joined one in flight, "
+    "cached reused a recent result.",
+    ("name", "outcome")))
+
+
+def normalize_query(query_string: str, ignore: Iterable[str] = ()) -> Tuple[tuple, ...]:
+    """Order-independent form of a query string, for use in coalescing keys."""
+    skipped = set(ignore)
+    return tuple(sorted((k, v) for k, v in parse_qsl(query_string, keep_blank_values=True)
+                        if k not in skipped))
+
+
+class SingleFlight:
+    """Shares one in-flight coroutine result between concurrent identical calls.
+
+    The work runs in its own task, so a caller that disconnects does not
+    cancel it for the others. Completed results are reused for ``ttl``
+    seconds; ``ttl=0`` only coalesces calls that overlap in time.
+    """
+
+    def __init__(self, name: str, ttl: float = 0.0, max_results: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.max_results = max_results
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._results: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        cached = self._results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                singleflight_requests.inc(self.name, "cached")
+                return cached[1]
+            del self._results[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            singleflight_requests.inc(self.name, "shared")
+        else:
+            singleflight_requests.inc(self.name, "leader")
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._complete(key, t))
+        return await asyncio.shield(task)
+
+    def _complete(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if self.ttl <= 0 or task.cancelled() or task.exception() is not None:
+            return
+        self._results[key] = (time.monotonic() + self.ttl, task.result())
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
@@ -0,0 +1,107 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from starlette.requests import Request
+
+
+class CollectionVersion:
+    """Cheap change marker for a collection: its newest timestamp and row count.
+
+    The marker is cached for ``ttl`` seconds so polling clients do not cost a
+    round-trip each; local writes call ``invalidate`` so this worker notices
+    them immediately, while writes on other workers show up within ``ttl``.
+
+    ``changed_at`` is the server time at which the marker was last seen to
+    change. Row timestamps are not usable for Last-Modified: write-behind
+    flushes and other workers' clocks insert rows older than the newest one,
+    and deletions do not move the newest timestamp at all.
+    """
+
+    def __init__(self, ttl: float = 1.0, field: str = "timestamp"):
+        self.ttl = ttl
+        self.field = field
+        self.last_modified: Optional[datetime] = None
+        self.count = 0
+        self.changed_at: Optional[datetime] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def token(self) -> str:
+        stamp = self.last_modified.isoformat() if self.last_modified else "empty"
+        return f"{stamp}:{self.count}"
+
+    def invalidate(self):
+        self._checked_at = 0.0
+
+    async def refresh(self, collection) -> "CollectionVersion":
+        if time.monotonic() - self._checked_at < self.ttl:
+            return self
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.ttl:
+                return self
+            newest, count = await asyncio.gather(
+                collection.find({}, {"_id": 0, self.field: 1}).sort(self.field, -1).limit(1).to_list(1),
+                collection.estimated_document_count(),
+            )
+            previous = self.token if self.changed_at else None
+            self.last_modified = newest[0][self.field] if newest else None
+            self.count = count
+            if self.token != previous:
+                self.changed_at = datetime.now(timezone.utc)
+            self._checked_at = time.monotonic()
+        return self
+
+
+def make_etag(version: CollectionVersion, variant: str = "") -> str:
+    digest = hashlib.blake2b(f"{version.token}|{variant}".encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def http_last_modified(changed_at: Optional[datetime]) -> Optional[datetime]:
+    """Last-Modified for a change seen at ``changed_at``: the end of its second.
+
+    HTTP dates have one-second resolution, so the date is only given once
+    that second is over; any later change then falls in a later second.
+    """
+    if changed_at is None:
+        return None
+    stamp = changed_at.replace(microsecond=0) + timedelta(seconds=1)
+    return stamp if stamp <= datetime.now(timezone.utc) else None
+
+
+def validator_headers(etag: str, changed_at: Optional[datetime]) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    last_modified = http_last_modified(changed_at)
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, etag: str, changed_at: Optional[datetime]) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since (RFC 9110 13.2.2)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        # Weak comparison: W/"x" and "x" match
+        bare = etag[2:] if etag.startswith("W/") else etag
+        return "*" in candidates or etag in candidates or bare in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and changed_at is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Dates in the future are invalid; a change in the same second as
+        # the date may have happened after it, so only earlier seconds match
+        if since > datetime.now(timezone.utc):
+            return False
+        return changed_at.replace(microsecond=0) < since
+    return False
@@ -0,0 +1,74 @@
+import logging
+import os
+
+from pymongo import ASCENDING
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# "standard" keeps a regular collection, optionally pruned by a TTL index.
+# "capped" and "timeseries" only apply when the collection is first created;
+# an existing collection is never converted.
+STATUS_COLLECTION_MODE = os.environ.get('STATUS_COLLECTION_MODE', 'standard')
+STATUS_RETENTION_DAYS = float(os.environ.get('STATUS_RETENTION_DAYS', '0'))
+STATUS_CAPPED_SIZE_MB = int(os.environ.get('STATUS_CAPPED_SIZE_MB', '1024'))
+
+STATUS_INDEXES = [
+    ([("timestamp", ASCENDING), ("id", ASCENDING)], {"name": "timestamp_id"}),
+    ([("client_name", ASCENDING), ("timestamp", ASCENDING), ("id", ASCENDING)],
+     {"name": "client_name_timestamp_id"}),
+]
+
+
+def retention_seconds() -> int:
+    return int(STATUS_RETENTION_DAYS * 86400)
+
+
+async def create_status_collection(db, name: str = "status_checks"):
+    """Create the collection in the configured mode if it does not exist yet."""
+    if name in await db.list_collection_names():
+        return
+    options = {}
+    if STATUS_COLLECTION_MODE == 'capped':
+        options = {"capped": True, "size": STATUS_CAPPED_SIZE_MB * 1024 * 1024}
+    elif STATUS_COLLECTION_MODE == 'timeseries':
+        options = {"timeseries": {"timeField": "timestamp", "metaField": "client_name",
+                                  "granularity": "seconds"}}
+        if retention_seconds():
+            options["expireAfterSeconds"] = retention_seconds()
+    elif STATUS_COLLECTION_MODE != 'standard':
+        raise ValueError(f"Unknown STATUS_COLLECTION_MODE: {STATUS_COLLECTION_MODE}")
+    try:
+        await db.create_collection(name, **options)
+        logger.info("Created %s collection in %s mode", name, STATUS_COLLECTION_MODE)
+    except CollectionInvalid:
+        pass  # another worker created it first
+
+
+async def ensure_ttl_index(collection):
+    """Create or update the retention TTL index on ``timestamp``."""
+    ttl = retention_seconds()
+    if not ttl:
+        return
+    try:
+        await collection.create_index("timestamp", name="timestamp_ttl", expireAfterSeconds=ttl)
+    except OperationFailure as e:
+        # IndexOptionsConflict: the retention changed since the index was built
+        if e.code != 85:
+            raise
+        await collection.database.command(
+            "collMod", collection.name,
+            index={"name": "timestamp_ttl", "expireAfterSeconds": ttl},
+        )
+        logger.info("Updated %s retention to %d seconds", collection.name, ttl)
+
+
+async def ensure_status_indexes(db):
+    """Bootstrap the status_checks collection, its indexes and retention."""
+    await create_status_collection(db)
+    collection = db.status_checks
+    for keys, options in STATUS_INDEXES:
+        await collection.create_index(keys, **options)
+    # Time-series collections carry their retention as a collection option
+    if STATUS_COLLECTION_MODE == 'standard':
+        await ensure_ttl_index(collection)
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(value: datetime) -> float:
+    # MongoDB stores milliseconds; truncate local values the same way
+    value = value.replace(microsecond=value.microsecond // 1000 * 1000)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH).total_seconds()
+
+
+class LatestStatus:
+    """Newest status check of one client; the client name is the index key.
+
+    The timestamp is kept as epoch seconds in a float rather than a datetime,
+    which with ``__slots__`` keeps each entry to a few dozen bytes plus the id.
+    """
+
+    __slots__ = ("id", "ts")
+
+    def __init__(self, id: str, ts: float):
+        self.id = id
+        self.ts = ts
+
+    def as_dict(self, client_name: str) -> dict:
+        return {"id": self.id, "client_name": client_name,
+                "timestamp": EPOCH + timedelta(seconds=self.ts)}
+
+
+class LatestStatusIndex:
+    """Maps client_name to its latest status check for O(1) lookups.
+
+    Updated from local writes; ``catch_up`` periodically reads rows written by
+    other workers since the last high-water mark, re-reading an ``overlap``
+    window to tolerate clock skew and delayed batch flushes.
+    """
+
+    def __init__(self, overlap: float = 5.0):
+        self.overlap = overlap
+        self.high_water: Optional[float] = None
+        self._latest: Dict[str, LatestStatus] = {}
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+    def get(self, client_name: str) -> Optional[dict]:
+        entry = self._latest.get(client_name)
+        return entry.as_dict(client_name) if entry else None
+
+    def update(self, docs: Iterable[dict]):
+        for doc in docs:
+            ts = to_epoch(doc["timestamp"])
+            entry = self._latest.get(doc["client_name"])
+            if entry is None:
+                self._latest[doc["client_name"]] = LatestStatus(doc["id"], ts)
+            elif (ts, doc["id"]) > (entry.ts, entry.id):
+                entry.id, entry.ts = doc["id"], ts
+            if self.high_water is None or ts > self.high_water:
+                self.high_water = ts
+
+    async def rebuild(self, collection):
+        """Replace the index with the newest row per client from an aggregation."""
+        pipeline = [
+            {"$sort": {"client_name": -1, "timestamp": -1, "id": -1}},
+            {"$group": {"_id": "$client_name", "id": {"$first": "$id"},
+                        "timestamp": {"$first": "$timestamp"}}},
+        ]
+        latest = {}
+        high_water = None
+        async for row in collection.aggregate(pipeline, allowDiskUse=True):
+            ts = to_epoch(row["timestamp"])
+            latest[row["_id"]] = LatestStatus(row["id"], ts)
+            high_water = ts if high_water is None else max(high_water, ts)
+        self._latest = latest
+        self.high_water = high_water
+        logger.info("Latest-status index rebuilt with %d clients", len(latest))
+
+    async def catch_up(self, collection):
+        if self.high_water is None:
+            return await self.rebuild(collection)
+        since = EPOCH + timedelta(seconds=self.high_water - self.overlap)
+        cursor = collection.find({"timestamp": {"$gte": since}},
+                                 {"_id": 0, "id": 1, "client_name": 1, "timestamp": 1})
+        batch = []
+        async for doc in cursor.batch_size(1000):
+            batch.append(doc)
+            if len(batch) >= 1000:
+                self.update(batch)
+                batch = []
+        self.update(batch)
+
+    async def refresh_forever(self, collection, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.catch_up(collection)
+            except Exception:
+                logger.exception("Latest-status index refresh failed")
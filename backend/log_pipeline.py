@@ -0,0 +1,153 @@
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+import metrics
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', '10000'))
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '0.01'))
+# "METHOD /path" pairs whose INFO/DEBUG logs are sampled; warnings always pass
+LOG_SAMPLED_ROUTES = {r.strip() for r in os.environ.get('LOG_SAMPLED_ROUTES', 'POST /api/status').split(',')
+                      if r.strip()}
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+log_sampled_var: contextvars.ContextVar[bool] = contextvars.ContextVar("log_sampled", default=True)
+
+dropped_logs = metrics.registry.register(metrics.Counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full."))
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_exception_formatter = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps the request ID on records and drops unsampled low-severity records.
+
+    Runs on the calling thread, before the record is queued, so context
+    variables still hold the values of the request that emitted it.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return record.levelno >= logging.WARNING or log_sampled_var.get()
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks: records are dropped and counted when the queue is full."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The base class folds the traceback into msg; keep it in exc_text so
+        # formatters still see the message and the exception separately
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_logs.inc()
+
+
+def configure_logging():
+    """Route all logging through a bounded queue drained by a background thread."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == 'json':
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'))
+
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+    # uvicorn installs its own synchronous handlers before importing the app
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler,
+                                               respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """Assigns a correlation ID to each request and makes the sampling decision."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        request_id = headers.get(REQUEST_ID_HEADER.lower().encode(), b"").decode("latin-1")[:128] \
+            or uuid.uuid4().hex
+        route = f'{scope["method"]} {scope["path"]}'
+        sampled = route not in LOG_SAMPLED_ROUTES or random.random() < LOG_SAMPLE_RATE
+        id_token = request_id_var.set(request_id)
+        sampled_token = log_sampled_var.set(sampled)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + \
+                    [(REQUEST_ID_HEADER.lower().encode(), request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_id_var.reset(id_token)
+            log_sampled_var.reset(sampled_token)
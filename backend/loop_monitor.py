@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Deque, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+LOOP_LAG_INTERVAL = float(os.environ.get('LOOP_LAG_INTERVAL', '0.1'))
+LOOP_BLOCK_THRESHOLD = float(os.environ.get('LOOP_BLOCK_THRESHOLD', '0.2'))
+LOOP_LAG_WINDOW = int(os.environ.get('LOOP_LAG_WINDOW', '600'))
+# Stalls kept for GET /api/admin/loop-blocks
+LOOP_BLOCK_HISTORY = int(os.environ.get('LOOP_BLOCK_HISTORY', '20'))
+# asyncio debug mode also reports slow callbacks, at a noticeable overhead
+LOOP_DEBUG = os.environ.get('LOOP_DEBUG', '').lower() in ('1', 'true', 'yes')
+
+loop_lag = metrics.registry.register(metrics.Histogram(
+    "event_loop_lag_seconds", "Delay between a scheduled wake-up of the event loop and when it ran.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)))
+loop_blocked = metrics.registry.register(metrics.Counter(
+    "event_loop_blocked_total", "Times the event loop was blocked longer than LOOP_BLOCK_THRESHOLD."))
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(q * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class LoopMonitor:
+    """Samples event-loop lag and captures the loop thread's stack when it stalls.
+
+    A coroutine wakes up every ``interval`` seconds and records how late it
+    ran. A watchdog thread watches the coroutine's heartbeat; when the loop
+    has not run for ``threshold`` seconds, it grabs the loop thread's current
+    frame from ``sys._current_frames()`` and logs the blocking stack. The
+    last ``history`` stalls are kept in ``recent_blocks``.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, threshold: float = LOOP_BLOCK_THRESHOLD,
+                 window: int = LOOP_LAG_WINDOW, history: int = LOOP_BLOCK_HISTORY):
+        self.interval = interval
+        self.threshold = threshold
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.recent_blocks: Deque[dict] = deque(maxlen=history)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        if LOOP_DEBUG:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = loop.create_task(self._sample())
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sample(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._heartbeat = now
+            self.samples.append(lag)
+            loop_lag.observe(lag)
+
+    def _watch(self):
+        reported = False
+        while not self._stop.wait(self.threshold / 2):
+            stalled = time.monotonic() - self._heartbeat - self.interval
+            if stalled < self.threshold:
+                reported = False
+                continue
+            if reported:
+                continue
+            # Report each stall once, with the stack the loop is stuck in
+            reported = True
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "<unavailable>"
+            loop_blocked.inc()
+            self.recent_blocks.append({"at": time.time(), "stalled_seconds": round(stalled, 3), "stack": stack})
+            logger.warning("Event loop blocked for %.3fs, loop thread stack:\n%s", stalled, stack)
+
+    def collect(self) -> List[str]:
+        values = sorted(self.samples)
+        lines = ["# TYPE event_loop_lag_quantile_seconds gauge"]
+        for q in (0.5, 0.95, 0.99):
+            lines.append(f'event_loop_lag_quantile_seconds{{quantile="{q}"}} {percentile(values, q)}')
+        lines.append(f'event_loop_lag_quantile_seconds{{quantile="1"}} {values[-1] if values else 0.0}')
+        return lines
@@ -0,0 +1,89 @@
+import os
+import threading
+
+from pymongo import monitoring
+
+
+def mongo_client_options() -> dict:
+    """Build AsyncIOMotorClient keyword arguments from the environment."""
+    options = {
+        'maxPoolSize': int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+        'minPoolSize': int(os.environ.get('MONGO_MIN_POOL_SIZE', '0')),
+        'maxConnecting': int(os.environ.get('MONGO_MAX_CONNECTING', '2')),
+        'maxIdleTimeMS': int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '300000')),
+        'waitQueueTimeoutMS': int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000')),
+        'serverSelectionTimeoutMS': int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+    }
+    # zstd needs the `zstandard` package and snappy needs `python-snappy`
+    compressors = os.environ.get('MONGO_COMPRESSORS')
+    if compressors:
+        options['compressors'] = compressors
+    return options
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks connection pool usage so readiness checks can report saturation.
+
+    Pool events arrive on pymongo's background threads, so counters are
+    guarded by a lock.
+    """
+
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self.open = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.checkout_failures = 0
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'max_pool_size': self.max_pool_size,
+                'open': self.open,
+                'checked_out': self.checked_out,
+                'waiting': self.waiting,
+                'checkout_failures': self.checkout_failures,
+                'saturation': round(self.checked_out / self.max_pool_size, 3) if self.max_pool_size else 0.0,
+            }
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self.waiting += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
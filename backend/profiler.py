@@ -0,0 +1,124 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+Frame = Tuple[str, str, int]
+Stack = Tuple[Frame, ...]
+
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def frame_key(frame) -> Frame:
+    code = frame.f_code
+    return (code.co_name, os.path.basename(code.co_filename), frame.f_lineno)
+
+
+def await_chain(task) -> Stack:
+    """Outermost-first frames of the coroutines a task is suspended in.
+
+    ``Task.get_stack()`` only returns the task's own coroutine frame, so the
+    chain is followed through ``cr_await`` (and ``gi_frame``/``ag_frame``
+    for generator-based awaitables) down to the innermost awaitable.
+    """
+    stack = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = (getattr(awaitable, 'cr_frame', None) or getattr(awaitable, 'gi_frame', None)
+                 or getattr(awaitable, 'ag_frame', None))
+        if frame is not None:
+            stack.append(frame_key(frame))
+        awaitable = (getattr(awaitable, 'cr_await', None) or getattr(awaitable, 'gi_yieldfrom', None)
+                     or getattr(awaitable, 'ag_await', None))
+    return tuple(stack)
+
+
+def walk(frame) -> Stack:
+    """Root-to-leaf stack for a frame."""
+    stack = []
+    while frame is not None:
+        stack.append(frame_key(frame))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+
+class SamplingProfiler:
+    """Periodic stack sampler for a live process.
+
+    Thread stacks come from ``sys._current_frames()`` on a background thread,
+    so they are sampled even while the event loop is blocked. Asyncio task
+    stacks are sampled on the loop itself and show where each pending task
+    is suspended.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.counts: Counter = Counter()
+        self.samples = 0
+
+    def _sample_threads(self, until: float):
+        own = threading.get_ident()
+        names = {}
+        while time.monotonic() < until:
+            names.update({t.ident: t.name for t in threading.enumerate()})
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                root = (f"thread:{names.get(thread_id, thread_id)}", "", 0)
+                self.counts[(root,) + walk(frame)] += 1
+            self.samples += 1
+            time.sleep(self.interval)
+
+    async def _sample_tasks(self, until: float):
+        current = asyncio.current_task()
+        while time.monotonic() < until:
+            for task in asyncio.all_tasks():
+                if task is current or task.done():
+                    continue
+                stack = await_chain(task)
+                if stack:
+                    self.counts[((f"task:{task.get_name()}", "", 0),) + stack] += 1
+            await asyncio.sleep(self.interval)
+
+    async def run(self, duration: float, include_tasks: bool = True):
+        until = time.monotonic() + duration
+        jobs = [asyncio.to_thread(self._sample_threads, until)]
+        if include_tasks:
+            jobs.append(self._sample_tasks(until))
+        await asyncio.gather(*jobs)
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, one ``frame;frame;... count`` per line."""
+        lines = []
+        for stack, count in self.counts.most_common():
+            names = [name if not file else f"{name} ({file}:{line})" for name, file, line in stack]
+            lines.append(f"{';'.join(names)} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> dict:
+        frames: List[dict] = []
+        index: Dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, count in self.counts.items():
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    fname, file, line = frame
+                    frames.append({"name": fname, "file": file, "line": line} if file else {"name": fname})
+                ids.append(index[frame])
+            samples.append(ids)
+            weights.append(count * self.interval)
+        total = sum(weights)
+        return {
+            "$schema": SPEEDSCOPE_SCHEMA,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled", "name": name, "unit": "seconds",
+                "startValue": 0, "endValue": total, "samples": samples, "weights": weights,
+            }],
+            "exporter": "agrivalah-profiler",
+        }
@@ -0,0 +1,156 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from starlette.responses import Response
+
+import metrics
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # only needed when CACHE_URL points at redis
+    redis = None
+
+CACHE_MAX_MB = float(os.environ.get('CACHE_MAX_MB', '64'))
+CACHE_URL = os.environ.get('CACHE_URL', '')
+# Per-route TTLs as "namespace=seconds" pairs
+CACHE_TTLS = {name.strip(): float(ttl) for name, _, ttl in
+              (pair.partition('=') for pair in os.environ.get(
+                  'CACHE_TTLS', 'status_list=5,status_summary=10').split(','))
+              if name.strip()}
+
+cache_requests = metrics.registry.register(metrics.Counter(
+    "response_cache_requests_total", "Response cache lookups by namespace and result.",
+    ("namespace", "result")))
+cache_evictions = metrics.registry.register(metrics.Counter(
+    "response_cache_evictions_total", "Entries evicted from the in-memory cache to stay under its byte limit."))
+cache_bytes = metrics.registry.register(metrics.Gauge(
+    "response_cache_bytes", "Bytes held by the in-memory response cache."))
+
+
+class MemoryBackend:
+    """Size-bounded LRU with per-entry expiry and byte accounting."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                cache_evictions.inc()
+            cache_bytes.set(self.size)
+
+    async def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    async def counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def _remove(self, key: str):
+        _, value = self._entries.pop(key)
+        self.size -= len(value)
+        cache_bytes.set(self.size)
+
+
+class RedisBackend:
+    """Shared backend so every worker sees the same entries and invalidations."""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise RuntimeError("CACHE_URL is set but the redis package is not installed")
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float):
+        await self._client.set(key, value, px=int(ttl * 1000))
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def counter(self, key: str) -> int:
+        return int(await self._client.get(key) or 0)
+
+
+def encode_response(response: Response) -> bytes:
+    head = {"status": response.status_code,
+            "headers": [(k.decode("latin-1"), v.decode("latin-1")) for k, v in response.raw_headers]}
+    return json.dumps(head).encode() + b"\n" + response.body
+
+
+def decode_response(value: bytes) -> Response:
+    head, _, body = value.partition(b"\n")
+    head = json.loads(head)
+    response = Response(body, status_code=head["status"])
+    response.raw_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in head["headers"]]
+    return response
+
+
+class ResponseCache:
+    """Caches complete responses per namespace with per-namespace TTLs.
+
+    Each namespace has a generation counter stored in the backend; keys embed
+    the current generation, so ``invalidate`` drops every entry of a
+    namespace at once, across workers when the backend is shared.
+    """
+
+    def __init__(self, backend, ttls: Dict[str, float]):
+        self.backend = backend
+        self.ttls = ttls
+
+    async def _key(self, namespace: str, key: str) -> str:
+        generation = await self.backend.counter(f"gen:{namespace}")
+        return f"resp:{namespace}:{generation}:{key}"
+
+    async def get_or_load(self, namespace: str, key: str,
+                          loader: Callable[[], Awaitable[Response]]) -> Response:
+        ttl = self.ttls.get(namespace, 0)
+        if ttl <= 0:
+            return await loader()
+        cache_key = await self._key(namespace, key)
+        cached = await self.backend.get(cache_key)
+        if cached is not None:
+            cache_requests.inc(namespace, "hit")
+            return decode_response(cached)
+        cache_requests.inc(namespace, "miss")
+        response = await loader()
+        if response.status_code == 200:
+            await self.backend.set(cache_key, encode_response(response), ttl)
+        return response
+
+    async def invalidate(self, *namespaces: str):
+        for namespace in namespaces:
+            await self.backend.incr(f"gen:{namespace}")
+
+
+def create_response_cache() -> ResponseCache:
+    backend = RedisBackend(CACHE_URL) if CACHE_URL else MemoryBackend(int(CACHE_MAX_MB * 1024 * 1024))
+    return ResponseCache(backend, CACHE_TTLS)
@@ -0,0 +1,215 @@
+import gzip
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # gzip only, see requirements.txt
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+COMPRESSION_CACHE_MB = float(os.environ.get('COMPRESSION_CACHE_MB', '32'))
+# Uncompressed bytes a stream buffers before flushing a compressed block
+COMPRESSION_STREAM_FLUSH_KB = int(os.environ.get('COMPRESSION_STREAM_FLUSH_KB', '32'))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+compression_cache_hits = metrics.registry.register(metrics.Counter(
+    "compression_cache_hits_total", "Responses served from the compressed-body cache.", ("encoding",)))
+compression_cache_misses = metrics.registry.register(metrics.Counter(
+    "compression_cache_misses_total", "Cacheable responses that had to be compressed.", ("encoding",)))
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by encoding and a digest of the raw body."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: tuple, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        try:
+            quality = float(params.strip()[2:]) if params.strip().startswith("q=") else 1.0
+        except ValueError:
+            quality = 1.0
+        if quality > 0:
+            accepted.add(token.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+class StreamCompressor:
+    """Incremental compressor for streaming responses.
+
+    Input is flushed once ``flush_size`` uncompressed bytes are pending, so
+    small chunks (one NDJSON row per body message) share compressed blocks
+    instead of paying a sync flush each.
+    """
+
+    def __init__(self, encoding: str, flush_size: int = COMPRESSION_STREAM_FLUSH_KB * 1024):
+        self.encoding = encoding
+        self.flush_size = flush_size
+        self.pending = 0
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes) -> bytes:
+        self.pending += len(data)
+        if self.encoding == "br":
+            out = self._compressor.process(data)
+        else:
+            out = self._compressor.compress(data)
+        if self.pending < self.flush_size:
+            return out
+        self.pending = 0
+        if self.encoding == "br":
+            return out + self._compressor.flush()
+        return out + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware applying gzip or brotli to JSON and text responses.
+
+    Bodies smaller than ``min_size`` are sent as-is. Complete 200 responses to
+    GET requests that are not marked private/no-store are cacheable: identical
+    bodies are compressed once and later served from ``CompressedBodyCache``.
+    """
+
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE,
+                 cache_bytes: int = int(COMPRESSION_CACHE_MB * 1024 * 1024)):
+        self.app = app
+        self.min_size = min_size
+        self.cache = CompressedBodyCache(cache_bytes) if cache_bytes > 0 else None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope.get("headers") or [])
+        encoding = choose_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        state = {"start": None, "stream": None, "passthrough": False}
+        cacheable_request = scope["method"] == "GET"
+
+        async def send_wrapper(message):
+            if state["passthrough"]:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                state["start"] = message
+                return
+
+            # First body message: decide how to handle the response
+            if message["type"] == "http.response.body" and state["stream"] is None:
+                start = state["start"]
+                response_headers = {k.lower(): v for k, v in start.get("headers", [])}
+                content_type = response_headers.get(b"content-type", b"").decode("latin-1")
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+
+                if (b"content-encoding" in response_headers
+                        or not content_type.startswith(COMPRESSIBLE_TYPES)
+                        or (not more_body and len(body) < self.min_size)):
+                    state["passthrough"] = True
+                    await send(start)
+                    return await send(message)
+
+                if not more_body:
+                    compressed = self._compress_complete(body, encoding, start, response_headers,
+                                                         cacheable_request)
+                    await send(self._start_message(start, encoding, len(compressed)))
+                    return await send({"type": "http.response.body", "body": compressed})
+
+                state["stream"] = StreamCompressor(encoding)
+                await send(self._start_message(start, encoding, None))
+
+            stream = state["stream"]
+            more_body = message.get("more_body", False)
+            data = stream.chunk(message.get("body", b""))
+            if not more_body:
+                data += stream.finish()
+            elif not data:
+                # Still buffering inside the compressor
+                return
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _compress_complete(self, body: bytes, encoding: str, start: dict, response_headers: dict,
+                           cacheable_request: bool) -> bytes:
+        cache_control = response_headers.get(b"cache-control", b"").lower()
+        cacheable = (self.cache is not None and cacheable_request and start["status"] == 200
+                     and b"no-store" not in cache_control and b"private" not in cache_control)
+        if not cacheable:
+            return compress(body, encoding)
+
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is not None:
+            compression_cache_hits.inc(encoding)
+            return compressed
+        compression_cache_misses.inc(encoding)
+        compressed = compress(body, encoding)
+        self.cache.put(key, compressed)
+        return compressed
+
+    @staticmethod
+    def _start_message(start: dict, encoding: str, length: Optional[int]) -> dict:
+        headers = [(k, v) for k, v in start.get("headers", [])
+                   if k.lower() not in (b"content-length", b"vary")]
+        vary = [v for k, v in start.get("headers", []) if k.lower() == b"vary"]
+        vary_value = b", ".join(vary + [b"Accept-Encoding"]) if vary else b"Accept-Encoding"
+        headers += [(b"content-encoding", encoding.encode()), (b"vary", vary_value)]
+        if length is not None:
+            headers.append((b"content-length", str(length).encode()))
+        return {**start, "headers": headers}
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional
+
+from pymongo import ASCENDING, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+
+class Resolution:
+    def __init__(self, name: str, seconds: int, retention_days: float):
+        self.name = name
+        self.seconds = seconds
+        self.retention_days = retention_days
+        self.collection = f"status_rollup_{name}"
+
+    def bucket(self, value: datetime) -> datetime:
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None) - value.utcoffset()
+        offset = (value - EPOCH) // timedelta(seconds=self.seconds)
+        return EPOCH + timedelta(seconds=offset * self.seconds)
+
+    def retained_since(self, now: datetime) -> Optional[datetime]:
+        return now - timedelta(days=self.retention_days) if self.retention_days else None
+
+
+# Finest first; 0 retention keeps rollups forever
+RESOLUTIONS = [
+    Resolution("minute", 60, float(os.environ.get('ROLLUP_MINUTE_RETENTION_DAYS', '7'))),
+    Resolution("hour", 3600, float(os.environ.get('ROLLUP_HOUR_RETENTION_DAYS', '180'))),
+    Resolution("day", 86400, float(os.environ.get('ROLLUP_DAY_RETENTION_DAYS', '0'))),
+]
+RESOLUTIONS_BY_NAME = {r.name: r for r in RESOLUTIONS}
+
+
+async def ensure_rollup_indexes(db):
+    for resolution in RESOLUTIONS:
+        collection = db[resolution.collection]
+        await collection.create_index([("client_name", ASCENDING), ("bucket", ASCENDING)],
+                                      name="client_name_bucket", unique=True)
+        await collection.create_index("bucket", name="bucket")
+        if resolution.retention_days:
+            await collection.create_index("expires_at", name="expires_at_ttl", expireAfterSeconds=0)
+
+
+async def apply_rollups(db, docs: Iterable[dict]):
+    """Add newly written status checks to every rollup resolution."""
+    docs = list(docs)
+    if not docs:
+        return
+    writes = []
+    for resolution in RESOLUTIONS:
+        counts = Counter((doc["client_name"], resolution.bucket(doc["timestamp"])) for doc in docs)
+        ops = []
+        for (client_name, bucket), count in counts.items():
+            update = {"$inc": {"count": count}}
+            if resolution.retention_days:
+                update["$setOnInsert"] = {"expires_at": bucket + timedelta(days=resolution.retention_days)}
+            ops.append(UpdateOne({"client_name": client_name, "bucket": bucket}, update, upsert=True))
+        writes.append(db[resolution.collection].bulk_write(ops, ordered=False))
+    try:
+        await asyncio.gather(*writes)
+    except Exception:
+        logger.exception("Rollup update failed for %d status checks", len(docs))
+
+
+class RollupWriter:
+    """Applies rollup updates on a background task, off the ingestion path.
+
+    Documents added while a rollup write is in flight are merged into the
+    next one, so a burst of small batches costs one round of upserts.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self._pending: List[dict] = []
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def add(self, docs: Iterable[dict]):
+        self._pending.extend(docs)
+        self._wake.set()
+
+    async def drain(self):
+        """Apply everything still pending and stop the background task."""
+        self._closing = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        while not (self._closing and not self._pending):
+            if not self._pending:
+                await self._wake.wait()
+                self._wake.clear()
+                continue
+            docs, self._pending = self._pending, []
+            await apply_rollups(self.db, docs)
+
+
+def choose_resolution(since: datetime, until: datetime, max_points: int, now: datetime) -> Resolution:
+    """Finest resolution that keeps the range under ``max_points`` and is still retained."""
+    span = (until - since).total_seconds()
+    for resolution in RESOLUTIONS:
+        retained = resolution.retained_since(now)
+        if span / resolution.seconds <= max_points and (retained is None or since >= retained):
+            return resolution
+    return RESOLUTIONS[-1]
+
+
+async def query_rollups(db, resolution: Resolution, since: datetime, until: datetime,
+                        client_name: Optional[str] = None) -> List[dict]:
+    match = {"bucket": {"$gte": resolution.bucket(since), "$lt": until}}
+    if client_name:
+        match["client_name"] = client_name
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$bucket", "count": {"$sum": "$count"}}},
+        {"$sort": {"_id": 1}},
+    ]
+    rows = await db[resolution.collection].aggregate(pipeline).to_list(None)
+    return [{"start": row["_id"], "count": row["count"]} for row in rows]
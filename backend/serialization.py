@@ -0,0 +1,40 @@
+import json
+from typing import Any, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+try:
+    import orjson
+except ImportError:  # optional speedup, see requirements.txt
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Encode plain data (dicts, lists, datetimes) with the fastest available encoder."""
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder)
+    return json.dumps(content, default=jsonable_encoder, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when installed, stdlib json otherwise."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+class ModelListResponse(Response):
+    """Serializes a list of pydantic models in one pass through pydantic-core.
+
+    Routes return this directly so FastAPI skips re-validating the list
+    against ``response_model`` and running ``jsonable_encoder`` per row; the
+    ``response_model`` declaration is still used for the OpenAPI schema.
+    """
+
+    media_type = "application/json"
+
+    def __init__(self, adapter: TypeAdapter, items: list, status_code: int = 200,
+                 headers: Optional[dict] = None):
+        super().__init__(adapter.dump_json(items), status_code=status_code, headers=headers)
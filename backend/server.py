@@ -1,23 +1,103 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+from pymongo.errors import BulkWriteError
+from typing import List, Optional
 import uuid
-from datetime import datetime
+import asyncio
+import hmac
+import base64
+import json
+from datetime import datetime, timedelta
+from write_buffer import WriteBehindBuffer, BufferFullError
+from mongo_pool import PoolMonitor, mongo_client_options
+from indexes import ensure_status_indexes
+from serialization import FastJSONResponse, ModelListResponse, dumps
+import metrics
+from log_pipeline import RequestContextMiddleware, configure_logging, shutdown_logging
+from response_compression import CompressionMiddleware
+from conditional import CollectionVersion, is_not_modified, make_etag, validator_headers
+from coalescing import SingleFlight, normalize_query
+from response_cache import create_response_cache
+from latest_index import LatestStatusIndex
+from archive import read_archive
+from loop_monitor import LoopMonitor
+from profiler import SamplingProfiler
+from rollups import (RESOLUTIONS_BY_NAME, RollupWriter, choose_resolution, ensure_rollup_indexes,
+                     query_rollups)
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, opened in the startup hook so each worker builds its
+# pool inside its own event loop
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+mongo_options = mongo_client_options()
+pool_monitor = PoolMonitor(mongo_options['maxPoolSize'])
+client: Optional[AsyncIOMotorClient] = None
+db = None
+READY_MAX_SATURATION = float(os.environ.get('MONGO_READY_MAX_SATURATION', '0.9'))
+
+# Status listing pagination; the default page matches the old fixed limit of
+# 1000 rows so callers that do not follow X-Next-Cursor see no change
+STATUS_PAGE_DEFAULT = int(os.environ.get('STATUS_PAGE_DEFAULT', '1000'))
+STATUS_PAGE_MAX = int(os.environ.get('STATUS_PAGE_MAX', '1000'))
+STATUS_STREAM_BATCH_SIZE = int(os.environ.get('STATUS_STREAM_BATCH_SIZE', '500'))
+STATUS_BULK_MAX = int(os.environ.get('STATUS_BULK_MAX', '10000'))
+STATUS_BULK_MAX_BYTES = int(float(os.environ.get('STATUS_BULK_MAX_MB', '8')) * 1024 * 1024)
+# Rows read back from status_checks were written by this service, so they are
+# trusted by default; set STATUS_STRICT_READS=1 to validate them again
+STATUS_STRICT_READS = os.environ.get('STATUS_STRICT_READS', '').lower() in ('1', 'true', 'yes')
+# Shared secret for /api/admin endpoints; they are disabled when unset
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+STATUS_SUMMARY_WINDOW_HOURS = float(os.environ.get('STATUS_SUMMARY_WINDOW_HOURS', '1'))
+# Longest [since, until) span and most time buckets one summary may cover
+STATUS_SUMMARY_MAX_DAYS = float(os.environ.get('STATUS_SUMMARY_MAX_DAYS', '31'))
+STATUS_SUMMARY_MAX_BUCKETS = int(os.environ.get('STATUS_SUMMARY_MAX_BUCKETS', '10000'))
+SUMMARY_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+# Longest [since, until) span one archive query may read
+ARCHIVE_QUERY_MAX_DAYS = float(os.environ.get('ARCHIVE_QUERY_MAX_DAYS', '31'))
+
+# Write-behind batching for status check ingestion
+STATUS_WRITE_OPTIONS = dict(
+    max_batch=int(os.environ.get('STATUS_WRITE_BATCH', '500')),
+    flush_interval=int(os.environ.get('STATUS_WRITE_FLUSH_MS', '50')) / 1000,
+    max_queue=int(os.environ.get('STATUS_WRITE_QUEUE', '10000')),
+    ack=os.environ.get('STATUS_WRITE_ACK', 'flush'),
+)
+status_writer: Optional[WriteBehindBuffer] = None
+rollup_writer: Optional[RollupWriter] = None
+
+# Change marker behind ETag / Last-Modified on status listings
+status_version = CollectionVersion(ttl=float(os.environ.get('STATUS_VERSION_TTL', '1.0')))
+
+
+# Identical concurrent listing reads share one query; results are reused briefly
+status_flight = SingleFlight("status_list", ttl=float(os.environ.get('STATUS_COALESCE_TTL', '0.5')))
+
+
+# Complete listing and summary responses, invalidated on every status write
+response_cache = create_response_cache()
+
+
+# Newest status check per client, kept in memory for O(1) lookups
+latest_status = LatestStatusIndex()
+LATEST_REFRESH_SECONDS = float(os.environ.get('STATUS_LATEST_REFRESH_SECONDS', '5'))
+latest_refresher: Optional[asyncio.Task] = None
+
+
+async def on_status_written(docs: List[dict]):
+    latest_status.update(docs)
+    status_version.invalidate()
+    rollup_writer.add(docs)
+    await response_cache.invalidate("status_list", "status_summary")
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -35,41 +115,556 @@ class StatusCheck(BaseModel):
 class StatusCheckCreate(BaseModel):
     client_name: str
 
+status_list_adapter = TypeAdapter(List[StatusCheck])
+
+class ClientSummary(BaseModel):
+    client_name: str
+    last_seen: datetime
+    last_id: str
+    count: int
+
+class TimeBucket(BaseModel):
+    start: datetime
+    count: int
+
+class StatusSummary(BaseModel):
+    since: datetime
+    until: Optional[datetime] = None
+    granularity: str
+    clients: List[ClientSummary]
+    buckets: List[TimeBucket]
+
+class RollupBucket(BaseModel):
+    start: datetime
+    count: int
+
+class StatusRollups(BaseModel):
+    resolution: str
+    since: datetime
+    until: datetime
+    buckets: List[RollupBucket]
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: str  # "created", "invalid" or "failed"
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkStatusResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
 # Add your routes to the router instead of directly to app
 @api_router.get("/")
 async def root():
     return {"message": "Hello World"}
 
+@api_router.get("/ready")
+async def readiness():
+    pool = pool_monitor.snapshot()
+    try:
+        await db.command("ping")
+        reachable = True
+    except Exception as e:
+        logger.warning("Readiness ping failed: %s", e)
+        reachable = False
+    ready = reachable and pool["saturation"] < READY_MAX_SATURATION
+    body = {
+        "status": "ready" if ready else "unavailable",
+        "mongo_reachable": reachable,
+        "pool": pool,
+        "write_queue": status_writer.pending,
+        "write_ack": status_writer.ack,
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@api_router.get("/status/latest", response_model=List[StatusCheck])
+async def get_latest_statuses(client_name: List[str] = Query(..., max_length=STATUS_PAGE_MAX)):
+    """Latest status check for each requested client, served from memory."""
+    found = [latest_status.get(name) for name in client_name]
+    return FastJSONResponse([row for row in found if row is not None])
+
+@api_router.get("/status/latest/{client_name}", response_model=StatusCheck)
+async def get_latest_status(client_name: str):
+    row = latest_status.get(client_name)
+    if row is None:
+        raise HTTPException(status_code=404, detail="No status checks for this client")
+    return FastJSONResponse(row)
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_dict = input.dict()
     status_obj = StatusCheck(**status_dict)
-    _ = await db.status_checks.insert_one(status_obj.dict())
+    try:
+        await status_writer.submit(status_obj.dict())
+    except BufferFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     return status_obj
 
+def bulk_too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+async def read_bulk_chunks(request: Request):
+    """Request body chunks, stopping with 413 past STATUS_BULK_MAX_BYTES."""
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > STATUS_BULK_MAX_BYTES:
+        raise bulk_too_large(f"Body exceeds {STATUS_BULK_MAX_BYTES} bytes")
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > STATUS_BULK_MAX_BYTES:
+            raise bulk_too_large(f"Body exceeds {STATUS_BULK_MAX_BYTES} bytes")
+        yield chunk
+
+
+def parse_bulk_line(line: bytes, number: int):
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Malformed line {number}: {e}")
+
+
+async def read_bulk_items(request: Request) -> list:
+    """Decode a JSON array or an NDJSON stream into raw items.
+
+    NDJSON is parsed line by line as it arrives, so an oversized stream is
+    rejected at item ``STATUS_BULK_MAX + 1`` instead of after the upload.
+    """
+    too_many = bulk_too_large(f"At most {STATUS_BULK_MAX} items per request")
+    if "ndjson" not in request.headers.get("content-type", ""):
+        body = b"".join([chunk async for chunk in read_bulk_chunks(request)])
+        try:
+            items = json.loads(body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Malformed body: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of status checks")
+        if len(items) > STATUS_BULK_MAX:
+            raise too_many
+        return items
+
+    items = []
+    pending = b""
+    number = 0
+    async for chunk in read_bulk_chunks(request):
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                if len(items) == STATUS_BULK_MAX:
+                    raise too_many
+                items.append(parse_bulk_line(line, number))
+    if pending.strip():
+        if len(items) == STATUS_BULK_MAX:
+            raise too_many
+        items.append(parse_bulk_line(pending, number + 1))
+    return items
+
+
+@api_router.post("/status/bulk", response_model=BulkStatusResult)
+async def create_status_checks_bulk(request: Request):
+    items = await read_bulk_items(request)
+
+    results = []
+    docs = []
+    for index, item in enumerate(items):
+        try:
+            status_obj = StatusCheck(**StatusCheckCreate.model_validate(item).dict())
+        except ValidationError as e:
+            results.append(BulkItemResult(index=index, status="invalid", error=str(e.errors()[0]["msg"])))
+            continue
+        results.append(BulkItemResult(index=index, status="created", id=status_obj.id))
+        docs.append(status_obj.dict())
+
+    if docs:
+        # Map positions in the insert batch back to positions in the request
+        created = [r for r in results if r.status == "created"]
+        try:
+            await db.status_checks.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for err in e.details.get("writeErrors", []):
+                result = created[err["index"]]
+                result.status, result.error = "failed", err.get("errmsg")
+        await on_status_written([doc for doc, r in zip(docs, created) if r.status == "created"])
+
+    created_count = sum(1 for r in results if r.status == "created")
+    return BulkStatusResult(created=created_count, failed=len(results) - created_count, results=results)
+
+
+# Keyset pagination helpers. Status checks are ordered by (timestamp, id) so a
+# cursor is just the sort key of the last row a client has seen.
+STATUS_FIELDS = set(StatusCheck.model_fields)
+
+
+def status_sort(order: str) -> list:
+    direction = 1 if order == "asc" else -1
+    return [("timestamp", direction), ("id", direction)]
+
+
+def encode_status_cursor(doc: dict) -> str:
+    payload = json.dumps([doc["timestamp"].isoformat(), doc["id"]])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_status_cursor(cursor: str, order: str = "asc") -> dict:
+    try:
+        timestamp, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        timestamp = datetime.fromisoformat(timestamp)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    op = "$gt" if order == "asc" else "$lt"
+    return {"$or": [
+        {"timestamp": {op: timestamp}},
+        {"timestamp": timestamp, "id": {op: last_id}},
+    ]}
+
+
+def build_status_query(client_name: Optional[str], since: Optional[datetime],
+                       until: Optional[datetime], cursor: Optional[str], order: str) -> dict:
+    """Translate listing filters into a Mongo query served by the status indexes."""
+    query = {}
+    if client_name:
+        query["client_name"] = client_name
+    if since or until:
+        query["timestamp"] = {}
+        if since:
+            query["timestamp"]["$gte"] = since
+        if until:
+            query["timestamp"]["$lt"] = until
+    if cursor:
+        query = {"$and": [query, decode_status_cursor(cursor, order)]} if query \
+            else decode_status_cursor(cursor, order)
+    return query
+
+
+def parse_status_fields(fields: Optional[str]) -> Optional[set]:
+    if not fields:
+        return None
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - STATUS_FIELDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def status_projection(fields: Optional[set]) -> dict:
+    # Only schema fields are read, so trusted rows can be emitted as-is.
+    # The sort key is always fetched so a next-page cursor can be built.
+    projection = {"_id": 0}
+    projection.update({f: 1 for f in (fields or STATUS_FIELDS) | {"timestamp", "id"}})
+    return projection
+
+
+def select_fields(doc: dict, fields: set) -> dict:
+    return {f: doc[f] for f in fields if f in doc}
+
+
+async def stream_status_checks(query: dict, sort: list, fields: Optional[set]):
+    cursor = db.status_checks.find(query, status_projection(fields)).sort(sort)
+    async for doc in cursor.batch_size(STATUS_STREAM_BATCH_SIZE):
+        if fields:
+            yield dumps(select_fields(doc, fields)) + b"\n"
+        elif STATUS_STRICT_READS:
+            yield StatusCheck(**doc).model_dump_json().encode() + b"\n"
+        else:
+            yield dumps(doc) + b"\n"
+
+
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(1000)
-    return [StatusCheck(**status_check) for status_check in status_checks]
+async def get_status_checks(
+    request: Request,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(STATUS_PAGE_DEFAULT, ge=1, le=STATUS_PAGE_MAX),
+    stream: bool = False,
+):
+    selected = parse_status_fields(fields)
+    query = build_status_query(client_name, since, until, cursor, order)
+    sort = status_sort(order)
+
+    # Unchanged collection: answer from the validators alone
+    version = await status_version.refresh(db.status_checks)
+    etag = make_etag(version, repr(normalize_query(request.url.query)))
+    headers = validator_headers(etag, version.changed_at)
+    if is_not_modified(request, etag, version.changed_at):
+        return Response(status_code=304, headers=headers)
+
+    # NDJSON export: walk the whole result set in bounded batches
+    if stream:
+        return StreamingResponse(stream_status_checks(query, sort, selected),
+                                 media_type="application/x-ndjson", headers=headers)
+
+    # The ETag already identifies collection version plus normalized query,
+    # so identical concurrent polls share one query and one serialization
+    page = await response_cache.get_or_load(
+        "status_list", etag,
+        lambda: status_flight.do(etag, lambda: load_status_page(query, sort, limit, selected)))
+    return Response(page.body, status_code=page.status_code, headers={**page.headers, **headers})
+
+
+async def load_status_page(query: dict, sort: list, limit: int, selected: Optional[set]) -> Response:
+    status_checks = await db.status_checks.find(query, status_projection(selected)) \
+        .sort(sort).limit(limit).to_list(limit)
+    headers = {}
+    if len(status_checks) == limit:
+        headers["X-Next-Cursor"] = encode_status_cursor(status_checks[-1])
+    if selected:
+        # Partial rows do not match the StatusCheck schema
+        return FastJSONResponse([select_fields(doc, selected) for doc in status_checks], headers=headers)
+    if STATUS_STRICT_READS:
+        return ModelListResponse(status_list_adapter,
+                                 [StatusCheck(**status_check) for status_check in status_checks],
+                                 headers=headers)
+    # Trusted read: rows already match the declared StatusCheck schema
+    return FastJSONResponse(status_checks, headers=headers)
+
+
+async def summarize_clients(match: dict) -> list:
+    # Walking the (client_name, timestamp, id) index backwards lets $first pick
+    # each client's newest row without sorting in memory
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"client_name": -1, "timestamp": -1, "id": -1}},
+        {"$group": {
+            "_id": "$client_name",
+            "last_seen": {"$first": "$timestamp"},
+            "last_id": {"$first": "$id"},
+            "count": {"$sum": 1},
+        }},
+        {"$sort": {"last_seen": -1}},
+    ]
+    rows = await db.status_checks.aggregate(pipeline).to_list(None)
+    return [ClientSummary(client_name=r["_id"], last_seen=r["last_seen"],
+                          last_id=r["last_id"], count=r["count"]) for r in rows]
+
+
+async def summarize_buckets(match: dict, unit: str, bin_size: int) -> list:
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"$dateTrunc": {"date": "$timestamp", "unit": unit, "binSize": bin_size}},
+            "count": {"$sum": 1},
+        }},
+        {"$sort": {"_id": 1}},
+    ]
+    rows = await db.status_checks.aggregate(pipeline).to_list(None)
+    return [TimeBucket(start=r["_id"], count=r["count"]) for r in rows]
+
+
+@api_router.get("/status/summary", response_model=StatusSummary)
+async def get_status_summary(
+    request: Request,
+    client_name: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    unit: str = Query("minute", pattern="^(second|minute|hour|day)$"),
+    bin_size: int = Query(1, ge=1, le=1440),
+):
+    # Both pipelines scan the whole window, so bound it before touching Mongo
+    window_end = naive_utc(until) if until else datetime.utcnow()
+    span = window_end - (naive_utc(since) if since
+                         else window_end - timedelta(hours=STATUS_SUMMARY_WINDOW_HOURS))
+    if span <= timedelta(0):
+        raise HTTPException(status_code=400, detail="until must be after since")
+    if span > timedelta(days=STATUS_SUMMARY_MAX_DAYS):
+        raise HTTPException(status_code=400,
+                            detail=f"Summaries may span at most {STATUS_SUMMARY_MAX_DAYS:g} days")
+    if span.total_seconds() / (bin_size * SUMMARY_UNIT_SECONDS[unit]) > STATUS_SUMMARY_MAX_BUCKETS:
+        raise HTTPException(status_code=400,
+                            detail=f"Summaries may have at most {STATUS_SUMMARY_MAX_BUCKETS} buckets; "
+                                   f"use a larger unit or bin_size")
+
+    async def load_summary() -> Response:
+        window_start = since or datetime.utcnow() - timedelta(hours=STATUS_SUMMARY_WINDOW_HOURS)
+        match = build_status_query(client_name, window_start, until, None, "asc")
+        clients, buckets = await asyncio.gather(
+            summarize_clients(match),
+            summarize_buckets(match, unit, bin_size),
+        )
+        summary = StatusSummary(since=window_start, until=until, granularity=f"{bin_size} {unit}",
+                                clients=clients, buckets=buckets)
+        return Response(summary.model_dump_json(), media_type="application/json")
+
+    return await response_cache.get_or_load(
+        "status_summary", repr(normalize_query(request.url.query)), load_summary)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Stored timestamps are naive UTC; bring query parameters to the same form."""
+    if value.tzinfo is None:
+        return value
+    return value.replace(tzinfo=None) - value.utcoffset()
+
+
+@api_router.get("/status/rollups", response_model=StatusRollups)
+async def get_status_rollups(
+    since: datetime,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None,
+    resolution: str = Query("auto", pattern="^(auto|minute|hour|day)$"),
+    max_points: int = Query(1440, ge=1, le=100000),
+):
+    """Status check counts over time from the per-minute/hour/day rollup collections.
+
+    With ``resolution=auto`` the finest resolution that fits the range in
+    ``max_points`` buckets (and is still retained) is used.
+    """
+    now = datetime.utcnow()
+    since = naive_utc(since)
+    until = naive_utc(until) if until else now
+    if until <= since:
+        raise HTTPException(status_code=400, detail="until must be after since")
+    chosen = choose_resolution(since, until, max_points, now) if resolution == "auto" \
+        else RESOLUTIONS_BY_NAME[resolution]
+    buckets = await query_rollups(db, chosen, since, until, client_name)
+    return FastJSONResponse({"resolution": chosen.name, "since": since, "until": until, "buckets": buckets})
+
+
+@api_router.get("/status/archive", response_model=List[StatusCheck])
+async def get_archived_status_checks(
+    since: datetime,
+    until: Optional[datetime] = None,
+    client_name: Optional[str] = None,
+    limit: int = Query(STATUS_PAGE_MAX, ge=1, le=STATUS_PAGE_MAX),
+):
+    """Status checks moved to cold storage by archive.py, read from local partitions."""
+    since = naive_utc(since)
+    until = naive_utc(until) if until else datetime.utcnow()
+    if until <= since:
+        raise HTTPException(status_code=400, detail="until must be after since")
+    if until - since > timedelta(days=ARCHIVE_QUERY_MAX_DAYS):
+        raise HTTPException(status_code=400,
+                            detail=f"Archive queries may span at most {ARCHIVE_QUERY_MAX_DAYS:g} days")
+    frame = await asyncio.to_thread(read_archive, since, until, client_name, limit=limit)
+    rows = frame.to_dict(orient="records")
+    return FastJSONResponse([{**row, "timestamp": row["timestamp"].to_pydatetime()} for row in rows])
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    # compare_digest rejects non-ASCII str; compare the header's raw bytes
+    # (Starlette decodes them as latin-1) with the UTF-8 token
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode('latin-1'),
+                                                    ADMIN_TOKEN.encode('utf-8')):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+profile_lock = asyncio.Lock()
+
+
+@api_router.get("/admin/profile", dependencies=[Depends(require_admin)], include_in_schema=False)
+async def profile_worker(
+    seconds: float = Query(5, gt=0, le=60),
+    interval_ms: float = Query(10, ge=1, le=1000),
+    format: str = Query("collapsed", pattern="^(collapsed|speedscope)$"),
+    tasks: bool = True,
+):
+    """Sample this worker's thread and asyncio task stacks for a flame graph."""
+    if profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    async with profile_lock:
+        profiler = SamplingProfiler(interval_ms / 1000)
+        await profiler.run(seconds, include_tasks=tasks)
+    if format == "speedscope":
+        return FastJSONResponse(profiler.speedscope(f"pid {os.getpid()}, {seconds}s"))
+    return PlainTextResponse(profiler.collapsed())
+
+
+@api_router.get("/admin/loop-blocks", dependencies=[Depends(require_admin)], include_in_schema=False)
+async def loop_blocks():
+    """Recent event-loop stalls on this worker, newest first, with the blocking stack."""
+    blocks = [{**block, "at": datetime.utcfromtimestamp(block["at"]).isoformat()}
+              for block in reversed(loop_monitor.recent_blocks)]
+    return FastJSONResponse({"pid": os.getpid(), "threshold_seconds": loop_monitor.threshold,
+                             "blocks": blocks})
+
 
 # Include the router in the main app
 app.include_router(api_router)
 
+
+def pool_metrics() -> list:
+    pool = pool_monitor.snapshot()
+    lines = []
+    for key in ("open", "checked_out", "waiting"):
+        name = f"mongodb_pool_{key}_connections"
+        lines += [f"# TYPE {name} gauge", f"{name} {pool[key]}"]
+    lines += ["# TYPE status_write_queue_depth gauge",
+              f"status_write_queue_depth {status_writer.pending if status_writer else 0}",
+              "# TYPE status_latest_index_clients gauge",
+              f"status_latest_index_clients {len(latest_status)}"]
+    return lines
+
+
+metrics.registry.add_collector(pool_metrics)
+
+# Event-loop lag sampling and blocked-loop stack capture
+loop_monitor = LoopMonitor()
+metrics.registry.add_collector(loop_monitor.collect)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Request-ID", "ETag"],
 )
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup_db_client():
+    global client, db, status_writer, rollup_writer, latest_refresher
+    loop_monitor.start()
+    client = AsyncIOMotorClient(mongo_url, event_listeners=[pool_monitor, metrics.CommandMetrics()],
+                                **mongo_options)
+    db = client[os.environ['DB_NAME']]
+    rollup_writer = RollupWriter(db)
+    rollup_writer.start()
+    status_writer = WriteBehindBuffer(db.status_checks, on_flush=on_status_written, **STATUS_WRITE_OPTIONS)
+    status_writer.start()
+    try:
+        await ensure_status_indexes(db)
+    except Exception:
+        logger.exception("Index bootstrap for status_checks failed")
+    try:
+        await ensure_rollup_indexes(db)
+    except Exception:
+        logger.exception("Index bootstrap for status rollups failed")
+    try:
+        await latest_status.rebuild(db.status_checks)
+    except Exception:
+        logger.exception("Latest-status index rebuild failed")
+    # Picks up writes made by other workers
+    if LATEST_REFRESH_SECONDS > 0:
+        latest_refresher = asyncio.create_task(
+            latest_status.refresh_forever(db.status_checks, LATEST_REFRESH_SECONDS))
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    if latest_refresher is not None:
+        latest_refresher.cancel()
+    await status_writer.drain()
+    await rollup_writer.drain()
     client.close()
+    loop_monitor.stop()
+    shutdown_logging()
@@ -0,0 +1,131 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Callable, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+ACK_ENQUEUE = "enqueue"
+ACK_FLUSH = "flush"
+
+
+class BufferFullError(Exception):
+    """Raised when the write-behind queue stays full past the enqueue timeout."""
+
+
+class WriteBehindBuffer:
+    """Groups single-document inserts into unordered ``insert_many`` batches.
+
+    A batch is flushed when it reaches ``max_batch`` documents or when
+    ``flush_interval`` seconds have passed since its first document arrived.
+    With ``ack="flush"`` callers wait until their document has been written;
+    with ``ack="enqueue"`` they return as soon as it is queued. ``on_flush``
+    (a function or coroutine function) is called with the written documents
+    after every batch.
+    """
+
+    def __init__(self, collection, max_batch: int = 500, flush_interval: float = 0.05,
+                 max_queue: int = 10000, ack: str = ACK_FLUSH, enqueue_timeout: float = 1.0,
+                 on_flush: Optional[Callable[[List[dict]], Any]] = None):
+        if ack not in (ACK_ENQUEUE, ACK_FLUSH):
+            raise ValueError(f"Unknown ack mode: {ack}")
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.ack = ack
+        self.enqueue_timeout = enqueue_timeout
+        self.on_flush = on_flush
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, doc: dict):
+        """Queue a document, applying backpressure when the queue is full."""
+        if self._closing:
+            raise BufferFullError("Write buffer is shutting down")
+        future = asyncio.get_running_loop().create_future() if self.ack == ACK_FLUSH else None
+        try:
+            await asyncio.wait_for(self._queue.put((doc, future)), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise BufferFullError("Write buffer is full")
+        if future is not None:
+            await future
+
+    async def drain(self):
+        """Flush everything still queued and stop the background task."""
+        self._closing = True
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+
+    async def _run(self):
+        while True:
+            batch, stop = await self._collect()
+            if batch:
+                await self._flush(batch)
+            if stop:
+                return
+
+    async def _collect(self) -> Tuple[List[tuple], bool]:
+        item = await self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _flush(self, batch: List[tuple]):
+        docs = [doc for doc, _ in batch]
+        errors = {}
+        try:
+            await self.collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            errors = {err["index"]: err for err in e.details.get("writeErrors", [])}
+            logger.warning("Write buffer flush: %d of %d documents failed", len(errors), len(docs))
+        except Exception as e:
+            logger.exception("Write buffer flush failed for %d documents", len(docs))
+            errors = {i: e for i in range(len(docs))}
+
+        # Resolve waiters first so acknowledgements never wait on on_flush;
+        # they resume at the next await, after on_flush's synchronous part
+        for i, (_, future) in enumerate(batch):
+            if future is None or future.done():
+                continue
+            if i in errors:
+                error = errors[i]
+                future.set_exception(error if isinstance(error, Exception)
+                                     else RuntimeError(error.get("errmsg", "write failed")))
+            else:
+                future.set_result(None)
+
+        if self.on_flush is not None and len(errors) < len(docs):
+            try:
+                result = self.on_flush([doc for i, doc in enumerate(docs) if i not in errors])
+                if inspect.isawaitable(result):
+                    await result
+            except Exception:
+                logger.exception("Write buffer on_flush callback failed")
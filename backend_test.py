@@ -5,23 +5,41 @@ Tests all backend APIs comprehensively using the public endpoint
 """
 
 import requests
+import argparse
+import asyncio
 import json
+import random
 import sys
+import threading
 import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+try:
+    import httpx
+except ImportError:  # only needed for --load
+    httpx = None
+
+from tests.scheduler import DEFAULT_WORKERS, depends, run_graph
+from tests.regression import add_arguments as add_gate_arguments, run_gated
+from tests.reporting import DEFAULT_REPORT_DIR, RunRecorder, percentile
+from tests.sessions import LoginError, provider_for, role_credentials
+
 class AgriValahAPITester:
     def __init__(self, base_url="http://localhost:8001"):
         self.base_url = base_url
         self.api_base = f"{base_url}/api/v1"
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # Pooled keep-alive session and login tokens shared by every suite in the process
+        self.auth = provider_for(self.api_base)
+        self.session = self.auth.session
         
         # Test tracking
         self.tests_run = 0
         self.tests_passed = 0
         self.failed_tests = []
+        self.recorder = RunRecorder(type(self).__name__)
+        self.report_dir = DEFAULT_REPORT_DIR
+        self.lock = threading.Lock()
         
         # Auth tokens
         self.customer_token = None
@@ -35,16 +53,18 @@ class AgriValahAPITester:
 
     def log_test(self, name: str, success: bool, details: str = ""):
         """Log test results"""
-        self.tests_run += 1
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} - {name}")
         if details:
             print(f"    {details}")
         
-        if success:
-            self.tests_passed += 1
-        else:
-            self.failed_tests.append(f"{name}: {details}")
+        self.recorder.record_test(name, success, details)
+        with self.lock:
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
+            else:
+                self.failed_tests.append(f"{name}: {details}")
         print()
 
     def make_request(self, method: str, endpoint: str, data: Dict = None, 
@@ -56,6 +76,7 @@ class AgriValahAPITester:
         if token:
             headers['Authorization'] = f'Bearer {token}'
             
+        start = time.perf_counter_ns()
         try:
             if method == 'GET':
                 response = self.session.get(url, headers=headers)
@@ -70,6 +91,7 @@ class AgriValahAPITester:
             else:
                 return False, {"error": f"Unsupported method: {method}"}
             
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, response)
             success = response.status_code == expected_status
             try:
                 response_data = response.json()
@@ -79,6 +101,7 @@ class AgriValahAPITester:
             return success, response_data
             
         except Exception as e:
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, error=e)
             return False, {"error": str(e)}
 
     def test_health_check(self):
@@ -109,42 +132,36 @@ class AgriValahAPITester:
             return False
 
     # Authentication Tests
+    @depends(produces=['customer_token', 'refresh_token', 'customer_id'])
     def test_customer_login(self):
-        """Test customer login"""
-        data = {
-            "emailOrPhone": "customer@test.com",
-            "password": "Test@123"
-        }
-        success, response = self.make_request('POST', 'auth/login', data)
+        """Test customer login (shared across suites through the session provider)"""
+        try:
+            credential = self.auth.credential('customer', self.make_request)
+        except LoginError as e:
+            self.log_test("Customer Login", False, f"Response: {e.response}")
+            return False
         
-        if success and ('token' in response or 'accessToken' in response):
-            self.customer_token = response.get('token') or response.get('accessToken')
-            self.refresh_token = response.get('refreshToken')
-            self.test_data['customer_id'] = response.get('user', {}).get('id')
-            details = f"Token received, User ID: {self.test_data.get('customer_id')}"
-        else:
-            details = f"Response: {response}"
-            
-        self.log_test("Customer Login", success, details)
-        return success
+        self.customer_token = credential.access_token
+        self.refresh_token = credential.refresh_token
+        self.test_data['customer_id'] = credential.user.get('id')
+        details = f"Token from {credential.source}, User ID: {self.test_data.get('customer_id')}"
+        self.log_test("Customer Login", True, details)
+        return True
 
+    @depends(produces=['admin_token'])
     def test_admin_login(self):
-        """Test admin login"""
-        data = {
-            "emailOrPhone": "admin@agrivalah.com",
-            "password": "Admin@123"
-        }
-        success, response = self.make_request('POST', 'auth/login', data)
+        """Test admin login (shared across suites through the session provider)"""
+        try:
+            credential = self.auth.credential('admin', self.make_request)
+        except LoginError as e:
+            self.log_test("Admin Login", False, f"Response: {e.response}")
+            return False
         
-        if success and ('token' in response or 'accessToken' in response):
-            self.admin_token = response.get('token') or response.get('accessToken')
-            self.test_data['admin_id'] = response.get('user', {}).get('id')
-            details = f"Token received, User ID: {self.test_data.get('admin_id')}"
-        else:
-            details = f"Response: {response}"
-            
-        self.log_test("Admin Login", success, details)
-        return success
+        self.admin_token = credential.access_token
+        self.test_data['admin_id'] = credential.user.get('id')
+        details = f"Token from {credential.source}, User ID: {self.test_data.get('admin_id')}"
+        self.log_test("Admin Login", True, details)
+        return True
 
     def test_signup_flow(self):
         """Test signup with OTP verification"""
@@ -175,23 +192,24 @@ class AgriValahAPITester:
         self.log_test("Signup Flow - OTP Verification", success, details)
         return success
 
+    @depends(consumes=['refresh_token'])
     def test_token_refresh(self):
         """Test token refresh functionality"""
         if not hasattr(self, 'refresh_token') or not self.refresh_token:
             self.log_test("Token Refresh", False, "No refresh token available")
             return False
             
-        refresh_data = {"refreshToken": self.refresh_token}
-        success, response = self.make_request('POST', 'auth/refresh', refresh_data)
-        
-        if success and ('token' in response or 'accessToken' in response):
-            details = "New token received"
-        else:
-            details = f"Response: {response}"
+        # Goes through the provider so the shared customer token is renewed too
+        try:
+            self.auth.refresh('customer', self.make_request)
+        except LoginError as e:
+            self.log_test("Token Refresh", False, f"Response: {e.response}")
+            return False
             
-        self.log_test("Token Refresh", success, details)
-        return success
+        self.log_test("Token Refresh", True, "New token received")
+        return True
 
+    @depends(consumes=['customer_token'], last=True)
     def test_logout(self):
         """Test logout functionality"""
         if not self.customer_token:
@@ -206,6 +224,7 @@ class AgriValahAPITester:
         return success
 
     # User Management Tests
+    @depends(consumes=['customer_token'])
     def test_get_user_profile(self):
         """Test get user profile"""
         if not self.customer_token:
@@ -224,6 +243,7 @@ class AgriValahAPITester:
         self.log_test("Get User Profile", success, details)
         return success
 
+    @depends(consumes=['customer_token'], after=['test_get_user_profile'])
     def test_update_user_profile(self):
         """Test update user profile"""
         if not self.customer_token:
@@ -242,6 +262,7 @@ class AgriValahAPITester:
         self.log_test("Update User Profile", success, details)
         return success
 
+    @depends(consumes=['customer_id'])
     def test_qr_code_generation(self):
         """Test QR code generation"""
         if not self.customer_token or not self.test_data.get('customer_id'):
@@ -260,6 +281,7 @@ class AgriValahAPITester:
         return success
 
     # Products Tests
+    @depends(produces=['product_id'])
     def test_get_products(self):
         """Test get products list"""
         success, response = self.make_request('GET', 'products')
@@ -275,6 +297,7 @@ class AgriValahAPITester:
         self.log_test("Get Products List", success, details)
         return success
 
+    @depends(consumes=['product_id'])
     def test_get_product_details(self):
         """Test get product details by ID"""
         product_id = self.test_data.get('product_id')
@@ -320,16 +343,12 @@ class AgriValahAPITester:
         return success
 
     # Orders Tests
-    def test_create_order(self):
-        """Test order creation"""
-        if not self.customer_token or not self.test_data.get('product_id'):
-            self.log_test("Create Order", False, "Missing customer token or product ID")
-            return False
-            
-        order_data = {
+    def order_payload(self, product_id: str) -> Dict:
+        """Order body used by the functional and load tests"""
+        return {
             "items": [
                 {
-                    "productId": self.test_data['product_id'],
+                    "productId": product_id,
                     "quantity": 2
                 }
             ],
@@ -344,6 +363,15 @@ class AgriValahAPITester:
             },
             "paymentMethod": "cod"
         }
+
+    @depends(produces=['order_id'], consumes=['customer_token', 'product_id'])
+    def test_create_order(self):
+        """Test order creation"""
+        if not self.customer_token or not self.test_data.get('product_id'):
+            self.log_test("Create Order", False, "Missing customer token or product ID")
+            return False
+            
+        order_data = self.order_payload(self.test_data['product_id'])
         
         success, response = self.make_request('POST', 'orders', order_data, 
                                             self.customer_token, 201)
@@ -357,6 +385,7 @@ class AgriValahAPITester:
         self.log_test("Create Order", success, details)
         return success
 
+    @depends(consumes=['customer_token'], after=['test_create_order'])
     def test_get_orders(self):
         """Test get user orders"""
         if not self.customer_token:
@@ -375,6 +404,7 @@ class AgriValahAPITester:
         self.log_test("Get Orders", success, details)
         return success
 
+    @depends(consumes=['customer_token', 'order_id'])
     def test_update_order_status(self):
         """Test order status update"""
         order_id = self.test_data.get('order_id')
@@ -390,6 +420,7 @@ class AgriValahAPITester:
         self.log_test("Update Order Status", success, details)
         return success
 
+    @depends(consumes=['customer_token', 'order_id'], after=['test_update_order_status'])
     def test_cancel_order(self):
         """Test order cancellation"""
         order_id = self.test_data.get('order_id')
@@ -406,6 +437,7 @@ class AgriValahAPITester:
         return success
 
     # Seller Registration Tests
+    @depends(produces=['seller_id'])
     def test_seller_registration_farmer(self):
         """Test farmer seller registration"""
         # Step 1: Initialize seller registration
@@ -452,6 +484,7 @@ class AgriValahAPITester:
         return success
 
     # Admin Tests
+    @depends(consumes=['admin_token'])
     def test_admin_dashboard_stats(self):
         """Test admin dashboard statistics"""
         if not self.admin_token:
@@ -470,6 +503,7 @@ class AgriValahAPITester:
         self.log_test("Admin Dashboard Stats", success, details)
         return success
 
+    @depends(consumes=['admin_token', 'seller_id'])
     def test_seller_verification(self):
         """Test seller verification by admin"""
         seller_id = self.test_data.get('seller_id')
@@ -490,6 +524,7 @@ class AgriValahAPITester:
         return success
 
     # File Upload Tests
+    @depends(consumes=['customer_token'])
     def test_signed_url_generation(self):
         """Test signed URL generation for file uploads"""
         if not self.customer_token:
@@ -540,68 +575,170 @@ class AgriValahAPITester:
         self.log_test("Search Suggestions", success, details)
         return success
 
-    def run_all_tests(self):
-        """Run all tests in sequence"""
+    # Load Testing
+    async def timed_request(self, client, stats: Dict, name: str, method: str, endpoint: str,
+                            data: Dict = None, token: str = None, expected_status: int = 200) -> tuple:
+        """Async request that records latency and errors under an endpoint name"""
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        entry = stats.setdefault(name, {'latencies': [], 'errors': 0})
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, f"{self.api_base}/{endpoint}", json=data, headers=headers)
+            success = response.status_code == expected_status
+            response_data = response.json() if success else {}
+        except Exception:
+            success, response_data = False, {}
+        entry['latencies'].append((time.perf_counter() - start) * 1000)
+        if not success:
+            entry['errors'] += 1
+        return success, response_data
+
+    async def load_login(self, client, stats: Dict) -> Optional[str]:
+        """Log a virtual user in as the test customer"""
+        login, password = role_credentials('customer')
+        data = {"emailOrPhone": login, "password": password}
+        success, response = await self.timed_request(client, stats, 'POST auth/login', 'POST', 'auth/login', data)
+        return (response.get('token') or response.get('accessToken')) if success else None
+
+    async def load_scenario(self, client, stats: Dict, token: Optional[str]):
+        """One iteration of the browse-search-order journey"""
+        success, response = await self.timed_request(client, stats, 'GET products', 'GET', 'products')
+        products = response.get('data', {}).get('products', []) if success else []
+        product_id = products[0].get('_id') if products else None
+        if product_id:
+            await self.timed_request(client, stats, 'GET products/{id}', 'GET', f'products/{product_id}')
+        await self.timed_request(client, stats, 'GET products?search', 'GET', 'products?search=organic')
+        await self.timed_request(client, stats, 'GET search', 'GET', 'search?q=organic&type=all')
+        if token and product_id:
+            await self.timed_request(client, stats, 'POST orders', 'POST', 'orders',
+                                     self.order_payload(product_id), token, 201)
+
+    async def run_load(self, users: int, duration: float, arrival_rate: float = None,
+                       ramp_up: float = 0) -> Dict:
+        """Replay the scenario with concurrent virtual users.
+
+        Without an arrival rate every user loops back to back (closed model),
+        with users started evenly over the ramp-up. With an arrival rate,
+        iterations start as a Poisson process whose rate grows linearly to
+        arrival_rate over the ramp-up (open model). An arrival that finds all
+        `users` busy is dropped and counted rather than queued, so queueing
+        time never goes unmeasured and no backlog runs past the duration.
+        """
+        if arrival_rate is not None and arrival_rate <= 0:
+            raise ValueError("arrival_rate must be positive")
+        stats = {}
+        dropped = 0
+        limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+        async with httpx.AsyncClient(limits=limits, timeout=30,
+                                     headers={'Content-Type': 'application/json'}) as client:
+            tokens = await asyncio.gather(*(self.load_login(client, stats) for _ in range(users)))
+            start = time.perf_counter()
+            deadline = start + duration
+
+            if arrival_rate is None:
+                async def virtual_user(index: int):
+                    await asyncio.sleep(ramp_up * index / users)
+                    while time.perf_counter() < deadline:
+                        await self.load_scenario(client, stats, tokens[index])
+                await asyncio.gather(*(virtual_user(i) for i in range(users)))
+            else:
+                running = set()
+
+                index = 0
+                while True:
+                    # Thinning: draw arrivals at the peak rate, keep them in
+                    # proportion to the current ramp-up rate
+                    await asyncio.sleep(random.expovariate(arrival_rate))
+                    elapsed = time.perf_counter() - start
+                    if elapsed >= duration:
+                        break
+                    if ramp_up and random.random() > elapsed / ramp_up:
+                        continue
+                    if len(running) >= users:
+                        dropped += 1
+                        continue
+                    task = asyncio.create_task(self.load_scenario(client, stats, tokens[index % users]))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                    index += 1
+                await asyncio.gather(*running)
+
+            elapsed = time.perf_counter() - start
+        return self.print_load_report(stats, elapsed, dropped)
+
+    def print_load_report(self, stats: Dict, elapsed: float, dropped: int = 0) -> Dict:
+        """Print and return throughput and latency percentiles per endpoint"""
+        report = {}
+        print("=" * 96)
+        print("📈 LOAD TEST REPORT")
+        print(f"{'Endpoint':<24}{'Requests':>10}{'Errors':>8}{'Req/s':>9}"
+              f"{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for name, entry in stats.items():
+            latencies = entry['latencies']
+            report[name] = {
+                'requests': len(latencies),
+                'errors': entry['errors'],
+                'throughput': len(latencies) / elapsed if elapsed else 0.0,
+                'p50': percentile(latencies, 50),
+                'p95': percentile(latencies, 95),
+                'p99': percentile(latencies, 99),
+                'max': max(latencies) if latencies else 0.0,
+            }
+            row = report[name]
+            print(f"{name:<24}{row['requests']:>10}{row['errors']:>8}{row['throughput']:>9.1f}"
+                  f"{row['p50']:>10.1f}{row['p95']:>10.1f}{row['p99']:>10.1f}{row['max']:>10.1f}")
+        total = sum(row['requests'] for row in report.values())
+        print(f"Total: {total} requests in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.1f} req/s)")
+        if dropped:
+            print(f"⚠️  Dropped arrivals: {dropped} (all virtual users busy; the target is saturated)")
+        print("=" * 96)
+        return report
+
+    def run_all_tests(self, workers: int = DEFAULT_WORKERS):
+        """Run all tests, independent ones in parallel"""
         print("🚀 Starting AgriValah Backend API Tests")
         print(f"🌐 Testing against: {self.base_url}")
         print("=" * 60)
         
-        # Basic connectivity tests
-        print("📡 CONNECTIVITY TESTS")
-        self.test_health_check()
-        self.test_api_docs()
-        
-        # Authentication tests
-        print("🔐 AUTHENTICATION TESTS")
-        self.test_customer_login()
-        self.test_admin_login()
-        self.test_signup_flow()
-        self.test_token_refresh()
-        
-        # User management tests
-        print("👤 USER MANAGEMENT TESTS")
-        self.test_get_user_profile()
-        self.test_update_user_profile()
-        self.test_qr_code_generation()
-        
-        # Products tests
-        print("📦 PRODUCTS TESTS")
-        self.test_get_products()
-        self.test_get_product_details()
-        self.test_product_search()
-        self.test_product_filter_by_category()
-        
-        # Orders tests
-        print("🛒 ORDERS TESTS")
-        self.test_create_order()
-        self.test_get_orders()
-        self.test_update_order_status()
-        self.test_cancel_order()
-        
-        # Seller registration tests
-        print("🏪 SELLER REGISTRATION TESTS")
-        self.test_seller_registration_farmer()
-        
-        # Admin tests
-        print("👑 ADMIN TESTS")
-        self.test_admin_dashboard_stats()
-        self.test_seller_verification()
-        
-        # File upload tests
-        print("📁 FILE UPLOAD TESTS")
-        self.test_signed_url_generation()
-        
-        # Search tests
-        print("🔍 SEARCH TESTS")
-        self.test_unified_search()
-        self.test_search_suggestions()
-        
-        # Logout test (at the end)
-        print("🚪 LOGOUT TEST")
-        self.test_logout()
-        
-        # Print summary
-        self.print_summary()
+        elapsed = run_graph([
+            # Connectivity
+            self.test_health_check,
+            self.test_api_docs,
+            # Authentication
+            self.test_customer_login,
+            self.test_admin_login,
+            self.test_signup_flow,
+            self.test_token_refresh,
+            # User management
+            self.test_get_user_profile,
+            self.test_update_user_profile,
+            self.test_qr_code_generation,
+            # Products
+            self.test_get_products,
+            self.test_get_product_details,
+            self.test_product_search,
+            self.test_product_filter_by_category,
+            # Orders
+            self.test_create_order,
+            self.test_get_orders,
+            self.test_update_order_status,
+            self.test_cancel_order,
+            # Seller registration
+            self.test_seller_registration_farmer,
+            # Admin
+            self.test_admin_dashboard_stats,
+            self.test_seller_verification,
+            # File upload
+            self.test_signed_url_generation,
+            # Search
+            self.test_unified_search,
+            self.test_search_suggestions,
+            # Logout runs once everything else is done
+            self.test_logout,
+        ], workers, self.session)
+        print(f"⏱️  Completed in {elapsed:.2f}s with {workers} worker(s)")
+        
+        return self.print_summary()
 
     def print_summary(self):
         """Print test summary"""
@@ -617,6 +754,10 @@ class AgriValahAPITester:
             for i, failure in enumerate(self.failed_tests, 1):
                 print(f"{i}. {failure}")
         
+        print("\n⏱️  ENDPOINT LATENCY")
+        self.recorder.print_endpoint_table()
+        for path in self.recorder.write(self.report_dir):
+            print(f"📝 Report written to {path}")
         print("=" * 60)
         
         # Return exit code
@@ -624,8 +765,35 @@ class AgriValahAPITester:
 
 def main():
     """Main function"""
-    tester = AgriValahAPITester()
-    exit_code = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description="AgriValah backend API tests")
+    parser.add_argument('--base-url', default="http://localhost:8001")
+    parser.add_argument('--load', action='store_true', help="Run the concurrent load mode instead")
+    parser.add_argument('--users', type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument('--duration', type=float, default=30, help="Load duration in seconds")
+    parser.add_argument('--rate', type=float, default=None,
+                        help="Scenario arrivals per second (open model); omit for closed-loop users")
+    parser.add_argument('--ramp-up', type=float, default=0, help="Seconds to reach full load")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Parallel workers for the functional tests (1 runs them in order)")
+    parser.add_argument('--report-dir', default=DEFAULT_REPORT_DIR,
+                        help="Directory for the JSON and JUnit XML reports")
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+
+    def make_tester():
+        tester = AgriValahAPITester(args.base_url)
+        tester.report_dir = args.report_dir
+        return tester
+
+    if args.load:
+        if args.rate is not None and args.rate <= 0:
+            parser.error("--rate must be positive")
+        if httpx is None:
+            print("❌ Load mode needs httpx: pip install httpx")
+            sys.exit(2)
+        report = asyncio.run(make_tester().run_load(args.users, args.duration, args.rate, args.ramp_up))
+        sys.exit(0 if all(row['errors'] == 0 for row in report.values()) else 1)
+    exit_code = run_gated(make_tester, lambda tester: tester.run_all_tests(args.workers), args)
     sys.exit(exit_code)
 
 if __name__ == "__main__":
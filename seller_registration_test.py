@@ -5,40 +5,53 @@ Tests the simplified seller registration endpoints as requested
 """
 
 import requests
+import argparse
 import json
 import sys
+import threading
 import time
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+from tests.scheduler import DEFAULT_WORKERS, depends, run_graph
+from tests.regression import add_arguments as add_gate_arguments, run_gated
+from tests.reporting import DEFAULT_REPORT_DIR, RunRecorder
+from tests.sessions import provider_for
+
 class SellerRegistrationTester:
     def __init__(self):
         # Use the production URL from frontend/.env
         self.base_url = "https://react-seller-debug.preview.emergentagent.com"
         self.api_base = f"{self.base_url}/api/v1"
-        self.session = requests.Session()
-        self.session.headers.update({'Content-Type': 'application/json'})
+        # Pooled keep-alive session and login tokens shared by every suite in the process
+        self.auth = provider_for(self.api_base)
+        self.session = self.auth.session
         
         # Test tracking
         self.tests_run = 0
         self.tests_passed = 0
         self.failed_tests = []
+        self.recorder = RunRecorder(type(self).__name__)
+        self.report_dir = DEFAULT_REPORT_DIR
+        self.lock = threading.Lock()
         
         # Test data storage
         self.test_data = {}
 
     def log_test(self, name: str, success: bool, details: str = ""):
         """Log test results"""
-        self.tests_run += 1
         status = "✅ PASS" if success else "❌ FAIL"
         print(f"{status} - {name}")
         if details:
             print(f"    {details}")
         
-        if success:
-            self.tests_passed += 1
-        else:
-            self.failed_tests.append(f"{name}: {details}")
+        self.recorder.record_test(name, success, details)
+        with self.lock:
+            self.tests_run += 1
+            if success:
+                self.tests_passed += 1
+            else:
+                self.failed_tests.append(f"{name}: {details}")
         print()
 
     def make_request(self, method: str, endpoint: str, data: Dict = None, 
@@ -46,6 +59,7 @@ class SellerRegistrationTester:
         """Make HTTP request and return success status and response"""
         url = f"{self.api_base}/{endpoint}"
         
+        start = time.perf_counter_ns()
         try:
             if method == 'GET':
                 response = self.session.get(url)
@@ -54,6 +68,7 @@ class SellerRegistrationTester:
             else:
                 return False, {"error": f"Unsupported method: {method}"}
             
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, response)
             success = response.status_code == expected_status
             try:
                 response_data = response.json()
@@ -63,6 +78,7 @@ class SellerRegistrationTester:
             return success, response_data
             
         except Exception as e:
+            self.recorder.record_request(method, endpoint, time.perf_counter_ns() - start, error=e)
             return False, {"error": str(e)}
 
     def test_backend_connectivity(self):
@@ -84,6 +100,7 @@ class SellerRegistrationTester:
             self.log_test("Backend Connectivity", False, f"Error: {str(e)}")
             return False
 
+    @depends(produces=['farmer_email', 'farmer_user_id'])
     def test_farmer_registration(self):
         """Test farmer seller registration with complete data"""
         farmer_data = {
@@ -246,6 +263,7 @@ class SellerRegistrationTester:
         self.log_test("Service Provider Registration", success, details)
         return success
 
+    @depends(consumes=['farmer_email'])
     def test_duplicate_email_validation(self):
         """Test duplicate email validation"""
         # Try to register with the farmer's email again
@@ -325,6 +343,7 @@ class SellerRegistrationTester:
         self.log_test("Invalid Seller Type Validation", success, details)
         return success
 
+    @depends(consumes=['farmer_email'])
     def test_send_otp_mock(self):
         """Test mock OTP sending"""
         farmer_email = self.test_data.get('farmer_email')
@@ -347,6 +366,7 @@ class SellerRegistrationTester:
         self.log_test("Send OTP Mock", success, details)
         return success
 
+    @depends(consumes=['farmer_email', 'farmer_user_id'], after=['test_send_otp_mock'])
     def test_verify_otp_mock_success(self):
         """Test mock OTP verification with correct OTP"""
         farmer_user_id = self.test_data.get('farmer_user_id')
@@ -383,6 +403,7 @@ class SellerRegistrationTester:
         self.log_test("Verify OTP Mock - Success", success, details)
         return success
 
+    @depends(consumes=['farmer_email', 'farmer_user_id'], after=['test_verify_otp_mock_success'])
     def test_verify_otp_mock_failure(self):
         """Test mock OTP verification with incorrect OTP"""
         farmer_user_id = self.test_data.get('farmer_user_id')
@@ -409,6 +430,7 @@ class SellerRegistrationTester:
         self.log_test("Verify OTP Mock - Failure", success, details)
         return success
 
+    @depends(consumes=['farmer_user_id'], after=['test_verify_otp_mock_success'])
     def test_get_seller_profile(self):
         """Test getting seller profile"""
         farmer_user_id = self.test_data.get('farmer_user_id')
@@ -441,41 +463,35 @@ class SellerRegistrationTester:
         self.log_test("Get Seller Profile", success, details)
         return success
 
-    def run_all_tests(self):
-        """Run all seller registration tests"""
+    def run_all_tests(self, workers: int = DEFAULT_WORKERS):
+        """Run all seller registration tests, independent ones in parallel"""
         print("🚀 Starting Seller Registration Backend API Tests")
         print(f"🌐 Testing against: {self.base_url}")
         print("=" * 60)
         
-        # Basic connectivity test
-        print("📡 CONNECTIVITY TESTS")
-        self.test_backend_connectivity()
-        
-        # Registration tests for different seller types
-        print("🏪 SELLER REGISTRATION TESTS")
-        self.test_farmer_registration()
-        self.test_reseller_registration()
-        self.test_startup_registration()
-        self.test_service_registration()
-        
-        # Validation tests
-        print("✅ VALIDATION TESTS")
-        self.test_duplicate_email_validation()
-        self.test_password_mismatch_validation()
-        self.test_invalid_seller_type_validation()
-        
-        # OTP tests
-        print("📱 OTP TESTS")
-        self.test_send_otp_mock()
-        self.test_verify_otp_mock_success()
-        self.test_verify_otp_mock_failure()
-        
-        # Profile retrieval test
-        print("👤 PROFILE TESTS")
-        self.test_get_seller_profile()
+        elapsed = run_graph([
+            # Connectivity
+            self.test_backend_connectivity,
+            # Registration for each seller type
+            self.test_farmer_registration,
+            self.test_reseller_registration,
+            self.test_startup_registration,
+            self.test_service_registration,
+            # Validation
+            self.test_duplicate_email_validation,
+            self.test_password_mismatch_validation,
+            self.test_invalid_seller_type_validation,
+            # OTP
+            self.test_send_otp_mock,
+            self.test_verify_otp_mock_success,
+            self.test_verify_otp_mock_failure,
+            # Profile, which expects the state left by OTP verification
+            self.test_get_seller_profile,
+        ], workers, self.session)
+        print(f"⏱️  Completed in {elapsed:.2f}s with {workers} worker(s)")
         
         # Print summary
-        self.print_summary()
+        return self.print_summary()
 
     def print_summary(self):
         """Print test summary"""
@@ -491,6 +507,10 @@ class SellerRegistrationTester:
             for i, failure in enumerate(self.failed_tests, 1):
                 print(f"{i}. {failure}")
         
+        print("\n⏱️  ENDPOINT LATENCY")
+        self.recorder.print_endpoint_table()
+        for path in self.recorder.write(self.report_dir):
+            print(f"📝 Report written to {path}")
         print("=" * 60)
         
         # Return exit code
@@ -498,8 +518,20 @@ class SellerRegistrationTester:
 
 def main():
     """Main function"""
-    tester = SellerRegistrationTester()
-    exit_code = tester.run_all_tests()
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help="Parallel workers (1 runs the tests in order)")
+    parser.add_argument('--report-dir', default=DEFAULT_REPORT_DIR,
+                        help="Directory for the JSON and JUnit XML reports")
+    add_gate_arguments(parser)
+    args = parser.parse_args()
+
+    def make_tester():
+        tester = SellerRegistrationTester()
+        tester.report_dir = args.report_dir
+        return tester
+
+    exit_code = run_gated(make_tester, lambda tester: tester.run_all_tests(args.workers), args)
     sys.exit(exit_code)
 
 if __name__ == "__main__":
@@ -0,0 +1,146 @@
+"""
+Latency regression gate for the API tester scripts.
+
+The tester's ``main()`` runs the suite ``--warmup`` times to warm
+connections and server caches, then ``--repeat`` more times. For each
+measured run the per-endpoint p50/p95 come from the run's ``RunRecorder``;
+the gate statistic is the median of those values across runs, so a single
+slow run does not fail the build. An endpoint regresses when its statistic
+exceeds the baseline by more than ``--tolerance`` (relative) and
+``--min-delta-ms`` (absolute, to ignore jitter on very fast endpoints).
+
+Baselines live in ``tests/latency_baseline.json``, keyed by suite and
+endpoint, and are refreshed with ``--update-baseline`` against a known-good
+deployment. Endpoints without a baseline are reported but never fail.
+"""
+
+import json
+import os
+import statistics
+from typing import Callable, Dict, List
+
+BASELINE_PATH = os.environ.get(
+    'LATENCY_BASELINE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'latency_baseline.json'))
+STATS = ('p50_ms', 'p95_ms')
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group("latency regression gate")
+    group.add_argument('--baseline', default=BASELINE_PATH, help="Latency baseline JSON file")
+    group.add_argument('--tolerance', type=float, default=0.25,
+                       help="Allowed relative slowdown over the baseline (0.25 = 25%%)")
+    group.add_argument('--min-delta-ms', type=float, default=10.0,
+                       help="Ignore slowdowns smaller than this many milliseconds")
+    group.add_argument('--warmup', type=int, default=1, help="Unmeasured runs before the gated runs")
+    group.add_argument('--repeat', type=int, default=3, help="Measured runs; the median across runs is gated")
+    group.add_argument('--update-baseline', action='store_true',
+                       help="Record this run's latencies as the new baseline instead of gating")
+    group.add_argument('--no-latency-gate', action='store_true', help="Run the suite once without gating")
+
+
+def load_baseline(path: str) -> Dict[str, Dict[str, dict]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as source:
+        return json.load(source)
+
+
+def aggregate(runs: List[Dict[str, dict]]) -> Dict[str, dict]:
+    """Median of each endpoint's per-run p50/p95 across measured runs"""
+    endpoints = sorted({key for run in runs for key in run})
+    summary = {}
+    for key in endpoints:
+        rows = [run[key] for run in runs if key in run]
+        summary[key] = {stat: round(statistics.median(row[stat] for row in rows), 3) for stat in STATS}
+        summary[key]['runs'] = len(rows)
+    return summary
+
+
+def compare(current: Dict[str, dict], baseline: Dict[str, dict], tolerance: float,
+            min_delta_ms: float) -> List[dict]:
+    """Endpoint stats that exceed their baseline by both tolerances"""
+    regressions = []
+    for key, row in current.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for stat in STATS:
+            limit = max(base[stat] * (1 + tolerance), base[stat] + min_delta_ms)
+            if row[stat] > limit:
+                regressions.append({'endpoint': key, 'stat': stat, 'baseline': base[stat],
+                                    'current': row[stat], 'limit': round(limit, 3)})
+    return regressions
+
+
+def print_comparison(current: Dict[str, dict], baseline: Dict[str, dict], regressions: List[dict]):
+    failed = {(r['endpoint'], r['stat']) for r in regressions}
+    width = max(len(key) for key in current) + 2
+    print(f"{'Endpoint':<{width}}{'p50 ms':>10}{'base':>10}{'p95 ms':>10}{'base':>10}")
+    for key, row in current.items():
+        base = baseline.get(key, {})
+        cells = []
+        for stat in STATS:
+            mark = "❌" if (key, stat) in failed else ""
+            cells.append(f"{mark}{row[stat]:.1f}".rjust(10))
+            cells.append(f"{base[stat]:.1f}".rjust(10) if stat in base else "-".rjust(10))
+        print(f"{key:<{width}}{''.join(cells)}")
+
+
+def run_gated(make_tester: Callable, run: Callable, args) -> int:
+    """Run a tester suite under the latency gate and return the exit code.
+
+    ``make_tester`` builds a fresh tester per run and ``run`` executes it,
+    returning the suite's exit code.
+    """
+    suite = make_tester().recorder.suite
+    baseline = load_baseline(args.baseline)
+    suite_baseline = baseline.get(suite, {})
+    if args.no_latency_gate or not (suite_baseline or args.update_baseline):
+        if not args.no_latency_gate:
+            print(f"ℹ️  No latency baseline for {suite} in {args.baseline}; "
+                  f"run with --update-baseline to record one")
+        return run(make_tester())
+
+    for i in range(args.warmup):
+        print(f"🔥 Warm-up run {i + 1}/{args.warmup}")
+        run(make_tester())
+    exit_code = 0
+    runs = []
+    for i in range(max(1, args.repeat)):
+        print(f"⏱️  Measured run {i + 1}/{max(1, args.repeat)}")
+        tester = make_tester()
+        exit_code = max(exit_code, run(tester) or 0)
+        runs.append(tester.recorder.endpoint_stats())
+    current = aggregate(runs)
+
+    print("=" * 60)
+    print(f"📈 LATENCY GATE ({suite}, median of {len(runs)} run(s))")
+    if not current:
+        # e.g. the suite stopped at its connectivity check
+        print("⚠️  No endpoints measured; nothing to gate")
+        print("=" * 60)
+        return exit_code
+    if args.update_baseline:
+        if exit_code:
+            print("❌ Not updating the baseline from a run with failing tests")
+            return exit_code
+        baseline[suite] = current
+        with open(args.baseline, 'w') as out:
+            json.dump(baseline, out, indent=2, sort_keys=True)
+            out.write("\n")
+        print(f"📝 Baseline for {len(current)} endpoint(s) written to {args.baseline}")
+        return 0
+
+    regressions = compare(current, suite_baseline, args.tolerance, args.min_delta_ms)
+    print_comparison(current, suite_baseline, regressions)
+    if regressions:
+        print(f"\n❌ {len(regressions)} latency regression(s) beyond "
+              f"{args.tolerance:.0%} / {args.min_delta_ms:g} ms:")
+        for r in regressions:
+            print(f"    {r['endpoint']} {r['stat']}: {r['current']:.1f} ms "
+                  f"(baseline {r['baseline']:.1f}, limit {r['limit']:.1f})")
+        print("=" * 60)
+        return max(exit_code, 1)
+    print("\n✅ No latency regressions")
+    print("=" * 60)
+    return exit_code
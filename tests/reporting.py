@@ -0,0 +1,207 @@
+"""
+Timing and result reports for the API tester scripts.
+
+Each tester times its ``make_request`` calls with ``time.perf_counter_ns``
+and hands them to a ``RunRecorder`` together with the status code and the
+request/response body sizes. ``log_test`` results are recorded too, with
+the time since the test's first request. Response sizes are the bytes on
+the wire, i.e. compressed when the server applied a Content-Encoding
+(see ``wire_size``).
+The recorder writes:
+
+    <report_dir>/<suite>.json        per-endpoint latency stats and every test
+    <report_dir>/<suite>.junit.xml   JUnit XML for CI test result viewers
+
+Endpoints are grouped by method, path and query parameter names; query
+values are dropped and id-like path segments (anything containing a digit)
+are replaced by ``:id``.
+"""
+
+import json
+import math
+import os
+import re
+import socket
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+DEFAULT_REPORT_DIR = os.environ.get('TEST_REPORT_DIR', 'test_reports')
+
+_ID_SEGMENT = re.compile(r'\d')
+
+
+def endpoint_key(method: str, endpoint: str) -> str:
+    """``GET products/64f1c2.../reviews?q=x&page=2`` -> ``GET /products/:id/reviews?page&q``"""
+    path, _, query = endpoint.partition('?')
+    path = path.strip('/')
+    segments = [':id' if _ID_SEGMENT.search(s) else s for s in path.split('/')] if path else []
+    key = f"{method} /{'/'.join(segments)}"
+    names = sorted({pair.split('=', 1)[0] for pair in query.split('&') if pair})
+    return f"{key}?{'&'.join(names)}" if names else key
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def wire_size(response) -> int:
+    """Response body size as transferred, before requests decodes gzip/br.
+
+    urllib3 does not count chunked reads, so encoded chunked responses
+    (streamed exports) fall back to the decoded size.
+    """
+    if not response.headers.get('Content-Encoding'):
+        return len(response.content)
+    try:
+        read = response.raw.tell()
+    except (AttributeError, OSError):
+        read = 0
+    length = response.headers.get('Content-Length')
+    return read or (int(length) if length and length.isdigit() else len(response.content))
+
+
+class RunRecorder:
+    """Collects request timings and test results from one tester run.
+
+    Safe to use from the scheduler's worker threads; each test runs on a
+    single thread, so the per-test timer is kept thread-local.
+    """
+
+    def __init__(self, suite: str):
+        self.suite = suite
+        self.started = datetime.now(timezone.utc)
+        self.requests: List[dict] = []
+        self.tests: List[dict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _mark(self) -> dict:
+        # Time and request count since the current test's first request
+        mark = getattr(self._local, 'mark', None)
+        if mark is None:
+            mark = self._local.mark = {'start_ns': time.perf_counter_ns(), 'requests': 0}
+        return mark
+
+    def record_request(self, method: str, endpoint: str, elapsed_ns: int, response=None,
+                       error: Optional[Exception] = None):
+        mark = self._mark()
+        if mark['requests'] == 0:
+            mark['start_ns'] -= elapsed_ns
+        mark['requests'] += 1
+        entry = {
+            'endpoint': endpoint_key(method, endpoint),
+            'elapsed_ms': elapsed_ns / 1e6,
+            'status': response.status_code if response is not None else None,
+            'bytes_sent': len(response.request.body or b'') if response is not None else 0,
+            'bytes_received': wire_size(response) if response is not None else 0,
+        }
+        if error is not None:
+            entry['error'] = f"{type(error).__name__}: {error}"
+        with self._lock:
+            self.requests.append(entry)
+
+    def record_test(self, name: str, success: bool, details: str = ""):
+        mark = getattr(self._local, 'mark', None)
+        self._local.mark = None
+        duration = (time.perf_counter_ns() - mark['start_ns']) / 1e9 if mark else 0.0
+        with self._lock:
+            self.tests.append({
+                'name': name,
+                'success': success,
+                'details': details,
+                'duration_s': round(duration, 6),
+                'requests': mark['requests'] if mark else 0,
+            })
+
+    def endpoint_stats(self) -> Dict[str, dict]:
+        grouped: Dict[str, List[dict]] = {}
+        for entry in self.requests:
+            grouped.setdefault(entry['endpoint'], []).append(entry)
+        stats = {}
+        for key in sorted(grouped):
+            entries = grouped[key]
+            latencies = [e['elapsed_ms'] for e in entries]
+            statuses: Dict[str, int] = {}
+            for e in entries:
+                code = str(e['status']) if e['status'] is not None else 'error'
+                statuses[code] = statuses.get(code, 0) + 1
+            stats[key] = {
+                'count': len(entries),
+                'status_codes': statuses,
+                'bytes_sent': sum(e['bytes_sent'] for e in entries),
+                'bytes_received': sum(e['bytes_received'] for e in entries),
+                'min_ms': round(min(latencies), 3),
+                'mean_ms': round(sum(latencies) / len(latencies), 3),
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'p99_ms': round(percentile(latencies, 99), 3),
+                'max_ms': round(max(latencies), 3),
+            }
+        return stats
+
+    def as_dict(self) -> dict:
+        return {
+            'suite': self.suite,
+            'started': self.started.isoformat(),
+            'tests': self.tests,
+            'endpoints': self.endpoint_stats(),
+            'requests': self.requests,
+        }
+
+    def junit(self) -> ET.ElementTree:
+        failures = [t for t in self.tests if not t['success']]
+        suite = ET.Element('testsuite', {
+            'name': self.suite,
+            'tests': str(len(self.tests)),
+            'failures': str(len(failures)),
+            'errors': '0',
+            'time': f"{sum(t['duration_s'] for t in self.tests):.6f}",
+            'timestamp': self.started.strftime('%Y-%m-%dT%H:%M:%S'),
+            'hostname': socket.gethostname(),
+        })
+        for test in self.tests:
+            case = ET.SubElement(suite, 'testcase', {
+                'classname': self.suite, 'name': test['name'], 'time': f"{test['duration_s']:.6f}",
+            })
+            if not test['success']:
+                ET.SubElement(case, 'failure', {'message': test['details'][:200]}).text = test['details']
+            elif test['details']:
+                ET.SubElement(case, 'system-out').text = test['details']
+        properties = ET.Element('properties')
+        for key, row in self.endpoint_stats().items():
+            for stat in ('count', 'p50_ms', 'p95_ms', 'p99_ms'):
+                ET.SubElement(properties, 'property', {'name': f"{key} {stat}", 'value': str(row[stat])})
+        suite.insert(0, properties)
+        return ET.ElementTree(suite)
+
+    def write(self, report_dir: str = DEFAULT_REPORT_DIR) -> List[str]:
+        """Write the JSON and JUnit XML reports; returns their paths"""
+        os.makedirs(report_dir, exist_ok=True)
+        json_path = os.path.join(report_dir, f"{self.suite}.json")
+        xml_path = os.path.join(report_dir, f"{self.suite}.junit.xml")
+        with open(json_path, 'w') as out:
+            json.dump(self.as_dict(), out, indent=2)
+        tree = self.junit()
+        ET.indent(tree)
+        tree.write(xml_path, encoding='utf-8', xml_declaration=True)
+        return [json_path, xml_path]
+
+    def print_endpoint_table(self):
+        stats = self.endpoint_stats()
+        if not stats:
+            return
+        width = max(len(key) for key in stats) + 2
+        print(f"{'Endpoint':<{width}}{'Count':>7}{'p50 ms':>10}{'p95 ms':>10}{'Max ms':>10}"
+              f"{'KB in':>9}  Status codes")
+        for key, row in stats.items():
+            codes = ', '.join(f"{code}×{n}" for code, n in sorted(row['status_codes'].items()))
+            print(f"{key:<{width}}{row['count']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}"
+                  f"{row['max_ms']:>10.1f}{row['bytes_received'] / 1024:>9.1f}  {codes}")
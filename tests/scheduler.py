@@ -0,0 +1,143 @@
+"""
+Dependency-graph scheduler for the API tester scripts.
+
+Test methods declare the shared values they produce and consume (tokens,
+product_id, order_id, ...) with ``@depends``; ``run_graph`` runs every test
+as soon as its producers have finished, on a thread pool. Output of each
+test is buffered and printed in one piece when the test completes, so the
+PASS/FAIL lines of concurrent tests do not interleave.
+
+    @depends(produces=['customer_token'])
+    def test_customer_login(self): ...
+
+    @depends(consumes=['customer_token'])
+    def test_get_user_profile(self): ...
+
+Tests without declarations are independent. ``workers=1`` runs the graph
+in declaration order, one test at a time.
+"""
+
+import io
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Set
+
+from requests.adapters import HTTPAdapter
+
+DEFAULT_WORKERS = 8
+
+
+def depends(produces: Iterable[str] = (), consumes: Iterable[str] = (),
+            after: Iterable[str] = (), last: bool = False):
+    """Declare a test's data dependencies.
+
+    ``after`` names tests that must finish first without sharing a value
+    (e.g. cancelling an order after its status update); ``last`` tests run
+    once every other test has finished (e.g. logout).
+    """
+    def decorate(test):
+        test.produces = tuple(produces)
+        test.consumes = tuple(consumes)
+        test.after = tuple(after)
+        test.last = last
+        return test
+    return decorate
+
+
+class _ThreadOutput(io.TextIOBase):
+    """stdout proxy that sends each worker thread's writes to its own buffer"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+        return (buffer if buffer is not None else self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def build_graph(tests: List[Callable]) -> Dict[str, Set[str]]:
+    """Map each test name to the names of the tests it waits for"""
+    names = [test.__name__ for test in tests]
+    producers: Dict[str, List[str]] = {}
+    for test in tests:
+        for value in getattr(test, 'produces', ()):
+            producers.setdefault(value, []).append(test.__name__)
+
+    graph = {}
+    for test in tests:
+        name = test.__name__
+        waits = set(getattr(test, 'after', ()))
+        for value in getattr(test, 'consumes', ()):
+            if value not in producers:
+                raise ValueError(f"{name} consumes '{value}' but no test produces it")
+            waits.update(producers[value])
+        if getattr(test, 'last', False):
+            waits.update(other.__name__ for other in tests if not getattr(other, 'last', False))
+        unknown = waits - set(names)
+        if unknown:
+            raise ValueError(f"{name} runs after unknown tests: {', '.join(sorted(unknown))}")
+        waits.discard(name)
+        graph[name] = waits
+    return graph
+
+
+def run_graph(tests: List[Callable], workers: int = DEFAULT_WORKERS, session=None) -> float:
+    """Run bound test methods in dependency order, ``workers`` at a time.
+
+    Passing the tester's ``requests.Session`` grows its connection pool to
+    the worker count if needed, so concurrent tests reuse keep-alive
+    connections.
+    Returns the wall-clock time in seconds.
+    """
+    graph = build_graph(tests)
+    by_name = {test.__name__: test for test in tests}
+    workers = max(1, workers)
+    if session is not None and getattr(session.get_adapter('https://'), '_pool_maxsize', 0) < workers:
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+
+    stdout = sys.stdout
+    output = _ThreadOutput(stdout)
+    lock = threading.Lock()
+
+    def run(test):
+        output.local.buffer = io.StringIO()
+        try:
+            return test()
+        finally:
+            text = output.local.buffer.getvalue()
+            output.local.buffer = None
+            with lock:
+                stdout.write(text)
+                stdout.flush()
+
+    pending = list(by_name)
+    done: Set[str] = set()
+    running = {}
+    start = time.perf_counter()
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='test') as pool:
+            while pending or running:
+                # Submit ready tests in declaration order
+                for name in [n for n in pending if graph[n] <= done]:
+                    if len(running) >= workers:
+                        break
+                    pending.remove(name)
+                    running[pool.submit(run, by_name[name])] = name
+                if not running:
+                    raise RuntimeError(f"Dependency cycle between: {', '.join(pending)}")
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(running.pop(future))
+                    future.result()
+    finally:
+        sys.stdout = stdout
+    return time.perf_counter() - start
@@ -0,0 +1,232 @@
+"""
+Shared HTTP sessions and login tokens for the API tester scripts.
+
+``provider_for(api_base)`` returns one ``SessionProvider`` per API base URL
+and process. Its ``session`` is a single ``requests.Session`` with a
+keep-alive connection pool that every tester against that URL shares, and
+``credential(role)`` logs in once per role and caches the access and
+refresh tokens with their expiry (read from the JWT ``exp`` claims). An
+access token close to expiry is renewed through ``POST auth/refresh``;
+only when that fails does the provider log in again.
+
+Set ``TEST_TOKEN_CACHE`` to a file path to also keep tokens between runs,
+so separate suite processes skip the login entirely while tokens are valid.
+Credentials come from ``TEST_<ROLE>_LOGIN`` / ``TEST_<ROLE>_PASSWORD``, with
+the seeded customer and admin accounts as defaults.
+"""
+
+import base64
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+POOL_SIZE = int(os.environ.get('TEST_POOL_SIZE', '16'))
+TOKEN_CACHE = os.environ.get('TEST_TOKEN_CACHE')
+# Renew tokens this many seconds before they expire
+EXPIRY_SKEW = float(os.environ.get('TEST_TOKEN_SKEW', '60'))
+# Used when a token carries no readable exp claim (the API's JWT_EXPIRE default is 15m)
+DEFAULT_TOKEN_TTL = float(os.environ.get('TEST_TOKEN_TTL', '900'))
+
+_DEFAULT_CREDENTIALS = {
+    'customer': ('customer@test.com', 'Test@123'),
+    'admin': ('admin@agrivalah.com', 'Admin@123'),
+}
+
+Request = Callable[..., Tuple[bool, dict]]
+
+
+def role_credentials(role: str) -> Optional[Tuple[str, str]]:
+    default = _DEFAULT_CREDENTIALS.get(role, (None, None))
+    login = os.environ.get(f'TEST_{role.upper()}_LOGIN', default[0])
+    password = os.environ.get(f'TEST_{role.upper()}_PASSWORD', default[1])
+    return (login, password) if login and password else None
+
+
+def jwt_expiry(token: Optional[str]) -> Optional[float]:
+    """``exp`` claim of a JWT, without verifying it"""
+    try:
+        payload = token.split('.')[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4)))
+        return float(claims['exp'])
+    except (AttributeError, IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class LoginError(Exception):
+    def __init__(self, role: str, response: dict):
+        super().__init__(f"{role} login failed: {response}")
+        self.role = role
+        self.response = response
+
+
+class Credential:
+    """Tokens of one logged-in role"""
+
+    def __init__(self, access_token: str, refresh_token: Optional[str], user: dict,
+                 source: str, expires_at: Optional[float] = None):
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.user = user or {}
+        # 'login', 'refresh' or 'cache'
+        self.source = source
+        self.expires_at = expires_at or jwt_expiry(access_token) or time.time() + DEFAULT_TOKEN_TTL
+        self.refresh_expires_at = jwt_expiry(refresh_token)
+
+    def fresh(self) -> bool:
+        return time.time() < self.expires_at - EXPIRY_SKEW
+
+    def refreshable(self) -> bool:
+        return bool(self.refresh_token) and (self.refresh_expires_at is None
+                                             or time.time() < self.refresh_expires_at - EXPIRY_SKEW)
+
+    def as_dict(self) -> dict:
+        return {'access_token': self.access_token, 'refresh_token': self.refresh_token,
+                'user': self.user, 'expires_at': self.expires_at}
+
+
+class SessionProvider:
+    """Pooled session and per-role token cache for one API base URL"""
+
+    def __init__(self, api_base: str, pool_size: int = POOL_SIZE, cache_path: Optional[str] = TOKEN_CACHE):
+        self.api_base = api_base
+        self.cache_path = cache_path
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.logins = 0
+        self._credentials: Dict[str, Credential] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._load_cache()
+
+    def make_request(self, method: str, endpoint: str, data: Dict = None, token: str = None,
+                     expected_status: int = 200) -> tuple:
+        """Same contract as the testers' make_request, for use without a tester"""
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        try:
+            response = self.session.request(method, f"{self.api_base}/{endpoint}", json=data,
+                                            headers=headers, timeout=30)
+            try:
+                return response.status_code == expected_status, response.json()
+            except ValueError:
+                return False, {"text": response.text, "status_code": response.status_code}
+        except requests.RequestException as e:
+            return False, {"error": str(e)}
+
+    def _role_lock(self, role: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(role, threading.Lock())
+
+    def credential(self, role: str, request: Request = None) -> Credential:
+        """Valid tokens for ``role``: cached, refreshed, or from a new login.
+
+        ``request`` is a tester's ``make_request``, so the login and refresh
+        calls show up in that tester's timings; defaults to the provider's own.
+        """
+        request = request or self.make_request
+        with self._role_lock(role):
+            credential = self._credentials.get(role)
+            if credential is not None and credential.fresh():
+                return credential
+            if credential is not None and credential.refreshable():
+                try:
+                    return self._refresh(role, credential, request)
+                except LoginError:
+                    pass
+            return self._login(role, request)
+
+    def refresh(self, role: str, request: Request = None) -> Credential:
+        """Renew the access token of a logged-in role through auth/refresh"""
+        request = request or self.make_request
+        with self._role_lock(role):
+            credential = self._credentials.get(role)
+            if credential is None or not credential.refresh_token:
+                raise LoginError(role, {"error": "No refresh token available"})
+            return self._refresh(role, credential, request)
+
+    def token(self, role: str, request: Request = None) -> Optional[str]:
+        try:
+            return self.credential(role, request).access_token
+        except LoginError:
+            return None
+
+    def invalidate(self, role: str):
+        with self._role_lock(role):
+            self._credentials.pop(role, None)
+            self._save_cache()
+
+    def _login(self, role: str, request: Request) -> Credential:
+        credentials = role_credentials(role)
+        if credentials is None:
+            raise LoginError(role, {"error": f"No credentials configured (TEST_{role.upper()}_LOGIN)"})
+        login, password = credentials
+        success, response = request('POST', 'auth/login', {"emailOrPhone": login, "password": password})
+        access_token = response.get('token') or response.get('accessToken')
+        if not success or not access_token:
+            raise LoginError(role, response)
+        self.logins += 1
+        return self._store(role, Credential(access_token, response.get('refreshToken'),
+                                            response.get('user', {}), 'login'))
+
+    def _refresh(self, role: str, credential: Credential, request: Request) -> Credential:
+        success, response = request('POST', 'auth/refresh', {"refreshToken": credential.refresh_token})
+        access_token = response.get('token') or response.get('accessToken')
+        if not success or not access_token:
+            raise LoginError(role, response)
+        # The API keeps the refresh token; take a new one if it ever rotates
+        return self._store(role, Credential(access_token, response.get('refreshToken') or credential.refresh_token,
+                                            response.get('user') or credential.user, 'refresh'))
+
+    def _store(self, role: str, credential: Credential) -> Credential:
+        self._credentials[role] = credential
+        self._save_cache()
+        return credential
+
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path) as source:
+                cached = json.load(source).get(self.api_base, {})
+        except (OSError, ValueError):
+            return
+        for role, entry in cached.items():
+            self._credentials[role] = Credential(entry['access_token'], entry.get('refresh_token'),
+                                                 entry.get('user'), 'cache', entry.get('expires_at'))
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        with self._lock:
+            try:
+                with open(self.cache_path) as source:
+                    cached = json.load(source)
+            except (OSError, ValueError):
+                cached = {}
+            cached[self.api_base] = {role: c.as_dict() for role, c in list(self._credentials.items())}
+            tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+            # Tokens are credentials; keep the file private to the user
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as out:
+                json.dump(cached, out)
+            os.replace(tmp, self.cache_path)
+
+
+_providers: Dict[str, SessionProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def provider_for(api_base: str) -> SessionProvider:
+    """The process-wide SessionProvider for an API base URL"""
+    with _providers_lock:
+        provider = _providers.get(api_base)
+        if provider is None:
+            provider = _providers[api_base] = SessionProvider(api_base)
+        return provider